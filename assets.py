@@ -0,0 +1,140 @@
+import os
+import struct
+import threading
+import time
+
+import pygame
+from pygame import mixer
+
+# Background asset loading.
+# The mixer is opened and every sound decoded on a worker thread, so the game
+# loop starts at once; until a sound is ready (or if it fails to load) its
+# name maps to a silent placeholder. Decoded samples are cached on disk as raw
+# PCM in the mixer's format, keyed on the source file's size and mtime, so
+# later launches skip decoding. Music streams, so it is only opened and
+# started on the worker. Per-asset load times and outcomes end up in timings.
+SOUNDS = {"shoot": "shoot.wav", "explosion": "explosion.wav", "powerup": "powerup.wav"}
+MUSIC = "background.mp3"
+CACHE_DIR = ".asset_cache"
+
+# Cache file: CACHE_HEADER then the raw samples
+CACHE_MAGIC = b"SSPC"
+CACHE_VERSION = 1
+CACHE_HEADER = struct.Struct("<4sBiiHQq")   # magic, version, frequency, format, channels, source size, source mtime (ns)
+
+class Silent:
+    def play(self, *args, **kwargs):
+        return None
+
+    def stop(self):
+        pass
+
+    def set_volume(self, volume):
+        pass
+
+    def get_length(self):
+        return 0.0
+
+SILENT = Silent()
+
+class AssetManager:
+    def __init__(self, sounds=SOUNDS, music=MUSIC, cache_dir=CACHE_DIR):
+        self.sound_files = dict(sounds)
+        self.music_file = music
+        self.cache_dir = cache_dir
+        self.sounds = {}    # name -> mixer.Sound, filled in by the worker
+        self.timings = {}   # asset -> (seconds, outcome)
+        self.ready = threading.Event()
+        self.closing = False
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.load_all, name="assets", daemon=True)
+        self.thread.start()
+
+    # Stops after the asset being loaded, so pygame can be shut down safely
+    def close(self):
+        self.closing = True
+        if self.thread is not None:
+            self.thread.join()
+
+    def sound(self, name):
+        return self.sounds.get(name, SILENT)
+
+    def load_all(self):
+        try:
+            self.timed("mixer", self.open_mixer)
+            for name, path in self.sound_files.items():
+                if self.closing:
+                    return
+                self.timed(name, self.load_sound, name, path)
+            if self.music_file and not self.closing:
+                self.timed("music", self.start_music, self.music_file)
+        finally:
+            self.ready.set()
+
+    def timed(self, asset, load, *args):
+        start = time.perf_counter()
+        try:
+            outcome = load(*args)
+        except (pygame.error, OSError) as error:
+            outcome = f"failed: {error}"
+        self.timings[asset] = (time.perf_counter() - start, outcome)
+
+    def open_mixer(self):
+        if not mixer.get_init():
+            mixer.init()
+        return "ok"
+
+    def load_sound(self, name, path):
+        if not mixer.get_init():
+            return "skipped: no mixer"
+        stat = os.stat(path)
+        cache = os.path.join(self.cache_dir, os.path.basename(path) + ".pcm")
+        key = (*mixer.get_init(), stat.st_size, stat.st_mtime_ns)
+        samples = self.read_cache(cache, key)
+        if samples is not None:
+            self.sounds[name] = mixer.Sound(buffer=samples)
+            return "cache"
+        sound = mixer.Sound(path)
+        self.sounds[name] = sound
+        self.write_cache(cache, key, sound.get_raw())
+        return "decoded"
+
+    def start_music(self, path):
+        if not mixer.get_init():
+            return "skipped: no mixer"
+        mixer.music.load(path)
+        mixer.music.play(-1)
+        return "streaming"
+
+    def read_cache(self, cache, key):
+        try:
+            with open(cache, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < CACHE_HEADER.size:
+            return None
+        magic, version, *stored = CACHE_HEADER.unpack_from(data)
+        if magic != CACHE_MAGIC or version != CACHE_VERSION or tuple(stored) != key:
+            return None
+        return data[CACHE_HEADER.size:]
+
+    # A cache that can't be written (read-only install, full disk) just
+    # means decoding again next launch
+    def write_cache(self, cache, key, samples):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            partial = cache + ".tmp"
+            with open(partial, "wb") as f:
+                f.write(CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, *key))
+                f.write(samples)
+            os.replace(partial, cache)
+        except OSError:
+            pass
+
+    # One "asset  time  outcome" line per asset loaded so far
+    def report(self):
+        return [f"{asset:<10}{seconds * 1000:8.1f} ms  {outcome}"
+                for asset, (seconds, outcome) in self.timings.items()]
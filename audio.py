@@ -0,0 +1,108 @@
+import math
+from collections import namedtuple
+
+from pygame import mixer
+
+from assets import SILENT
+
+# Sound scheduling.
+# Game events become triggers; once per tick, flush() turns them into at most
+# one playback per effect, on a fixed budget of mixer channels the scheduler
+# owns. Identical triggers within a tick merge into one. An effect is dropped
+# while it is cooling down or already playing on max_voices channels. When
+# every channel is busy, the new sound steals the channel of the oldest
+# strictly lower-priority voice, or is dropped if there is none. Sounds whose
+# assets aren't loaded yet are skipped without counting as dropped.
+
+# priority: higher steals from lower; cooldown: seconds between plays
+Effect = namedtuple("Effect", ["priority", "cooldown", "max_voices"], defaults=[0, 0.0, 1])
+
+EFFECTS = {
+    "shoot": Effect(priority=1, cooldown=0.05, max_voices=2),
+    "explosion": Effect(priority=2, cooldown=0.03, max_voices=3),
+    "powerup": Effect(priority=3, cooldown=0.0, max_voices=1),
+}
+DEFAULT_EFFECT = Effect()
+CHANNELS = 8
+
+STATS = ("triggered", "played", "merged", "dropped", "stolen")
+
+class SoundScheduler:
+    def __init__(self, assets, channels=CHANNELS, effects=EFFECTS):
+        self.assets = assets
+        self.budget = channels
+        self.effects = effects
+        self.channels = None             # mixer.Channel per voice, once the mixer is open
+        self.voices = [None] * channels  # (name, priority, started) last played on each channel
+        self.pending = {}                # effects triggered this tick, in trigger order
+        self.last_played = {}
+        self.totals = dict.fromkeys(STATS, 0)
+        self.rates = dict.fromkeys(STATS, 0.0)   # per second, over the last full second
+        self.window_start = None
+        self.window_totals = dict(self.totals)
+
+    def trigger(self, name):
+        self.totals["triggered"] += 1
+        if name in self.pending:
+            self.totals["merged"] += 1
+        else:
+            self.pending[name] = True
+
+    # Call once per tick, after the tick's triggers; now is in seconds
+    def flush(self, now):
+        if self.pending:
+            if self.channels is None and mixer.get_init():
+                mixer.set_num_channels(self.budget)
+                self.channels = [mixer.Channel(i) for i in range(self.budget)]
+            effect = lambda name: self.effects.get(name, DEFAULT_EFFECT)
+            for name in sorted(self.pending, key=lambda name: -effect(name).priority):
+                self.play(name, effect(name), now)
+            self.pending.clear()
+        self.update_rates(now)
+
+    def play(self, name, effect, now):
+        sound = self.assets.sound(name)
+        if sound is SILENT or self.channels is None:
+            return
+        if now - self.last_played.get(name, -math.inf) < effect.cooldown:
+            self.totals["dropped"] += 1
+            return
+
+        free = victim = None
+        playing = 0
+        for i, channel in enumerate(self.channels):
+            voice = self.voices[i]
+            if voice is None or not channel.get_busy():
+                if free is None:
+                    free = i
+                continue
+            if voice[0] == name:
+                playing += 1
+            if voice[1] < effect.priority and (victim is None or voice[1:] < self.voices[victim][1:]):
+                victim = i
+        if playing >= effect.max_voices:
+            self.totals["dropped"] += 1
+            return
+        if free is None:
+            if victim is None:
+                self.totals["dropped"] += 1
+                return
+            free = victim
+            self.channels[free].stop()
+            self.totals["stolen"] += 1
+
+        self.channels[free].play(sound)
+        self.voices[free] = (name, effect.priority, now)
+        self.last_played[name] = now
+        self.totals["played"] += 1
+
+    def update_rates(self, now):
+        if self.window_start is None:
+            self.window_start = now
+            return
+        elapsed = now - self.window_start
+        if elapsed >= 1.0:
+            for key in STATS:
+                self.rates[key] = (self.totals[key] - self.window_totals[key]) / elapsed
+            self.window_totals = dict(self.totals)
+            self.window_start = now
@@ -0,0 +1,173 @@
+import argparse
+import itertools
+import json
+import math
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from sim import Game, Controls, Rules, IDLE
+
+# Batch balancing runs.
+# Plays many headless games for every combination of a grid of Rules values,
+# with a scripted bot at the controls, spread over a process pool. Workers
+# only import sim (no pygame), play a chunk of seeded games each and send back
+# one tuple of running sums per chunk, so IPC stays tiny however many ticks
+# are played. Results stream out as each grid point finishes, one JSON line
+# per point with score, survival ticks and damage taken.
+#
+#   python batch.py --set enemy_spawn=0.01,0.02,0.04 --set ram_damage=25,50 --games 2000
+
+# Bot policies: game -> Controls for the next tick. Looked up by name in the
+# workers, so only the name crosses the process boundary.
+FIRE = Controls(shoot=True)
+
+def idle(game):
+    return IDLE
+
+def autofire(game):
+    return FIRE
+
+# Slide under the lowest enemy and keep firing
+def tracker(game):
+    player = game.player
+    target = None
+    for enemy in game.enemies:
+        if enemy.y < player.y and (target is None or enemy.y > target.y):
+            target = enemy
+    if target is None:
+        return FIRE
+    offset = (target.x + target.width / 2) - (player.x + player.width / 2)
+    return Controls(dx=(offset > player.speed) - (offset < -player.speed), shoot=True)
+
+# Track like tracker, but step aside from anything about to land on the player
+def dodger(game):
+    player = game.player
+    left, right = player.x, player.x + player.width
+    danger = player.y - 120 * game.scale
+    for enemy in game.enemies:
+        if enemy.y + enemy.height > danger and enemy.x < right and enemy.x + enemy.width > left:
+            centre = enemy.x + enemy.width / 2
+            away = 1 if centre < player.x + player.width / 2 else -1
+            if (away < 0 and left <= 0) or (away > 0 and right >= game.width):
+                away = -away
+            return Controls(dx=away, shoot=True)
+    return tracker(game)
+
+BOTS = {"idle": idle, "autofire": autofire, "tracker": tracker, "dodger": dodger}
+
+# Plays one game to game over or max_ticks; returns (score, ticks, damage, over)
+def play(rules, bot, seed, max_ticks, use_arrays=False):
+    game = Game(use_arrays=use_arrays, seed=seed, rules=rules)
+    update = game.update
+    while game.ticks < max_ticks and not game.game_over:
+        update(bot(game))
+    return game.score, game.ticks, game.damage_taken, game.game_over
+
+# Worker task: a chunk of seeds for one grid point, reduced to running sums
+# (games, game overs, then sum, sum of squares, min and max of each metric)
+def run_chunk(task):
+    point, rules, bot, seeds, max_ticks, use_arrays = task
+    policy = BOTS[bot]
+    sums = [0, 0] + [0, 0, math.inf, -math.inf] * 3
+    for seed in seeds:
+        *metrics, over = play(Rules(*rules), policy, seed, max_ticks, use_arrays)
+        sums[0] += 1
+        sums[1] += over
+        for k, value in enumerate(metrics):
+            base = 2 + 4 * k
+            sums[base] += value
+            sums[base + 1] += value * value
+            sums[base + 2] = min(sums[base + 2], value)
+            sums[base + 3] = max(sums[base + 3], value)
+    return point, sums
+
+METRICS = ("score", "ticks", "damage")
+
+def merge(total, sums):
+    if total is None:
+        return list(sums)
+    total[0] += sums[0]
+    total[1] += sums[1]
+    for base in range(2, len(sums), 4):
+        total[base] += sums[base]
+        total[base + 1] += sums[base + 1]
+        total[base + 2] = min(total[base + 2], sums[base + 2])
+        total[base + 3] = max(total[base + 3], sums[base + 3])
+    return total
+
+def summarize(rules, total):
+    games = total[0]
+    result = {"rules": rules._asdict(), "games": games, "game_over_rate": total[1] / games}
+    for k, name in enumerate(METRICS):
+        base = 2 + 4 * k
+        mean = total[base] / games
+        result[name] = {"mean": mean, "std": math.sqrt(max(0.0, total[base + 1] / games - mean * mean)),
+                        "min": total[base + 2], "max": total[base + 3]}
+    return result
+
+# "--set name=v1,v2" values, typed like the Rules default they replace
+def parse_grid(settings):
+    grid = {}
+    for setting in settings:
+        name, _, values = setting.partition("=")
+        if name not in Rules._fields:
+            raise SystemExit(f"unknown rule {name!r}, expected one of {', '.join(Rules._fields)}")
+        kind = type(Rules._field_defaults[name])
+        grid[name] = [kind(value) for value in values.split(",")]
+    return grid
+
+def grid_points(grid):
+    names = list(grid)
+    return [Rules()._replace(**dict(zip(names, values))) for values in itertools.product(*grid.values())]
+
+# Yields (rules, summary) for each grid point as its last chunk comes back
+def run_batch(points, bot, games, max_ticks, seed=0, chunk=16, processes=None, use_arrays=False):
+    tasks = [(point, tuple(rules), bot, range(seed + start, seed + min(games, start + chunk)), max_ticks, use_arrays)
+             for point, rules in enumerate(points)
+             for start in range(0, games, chunk)]
+    totals = [None] * len(points)
+    with Pool(processes) as pool:
+        for point, sums in pool.imap_unordered(run_chunk, tasks):
+            total = totals[point] = merge(totals[point], sums)
+            if total[0] == games:
+                yield points[point], summarize(points[point], total)
+
+def main():
+    parser = argparse.ArgumentParser(description="Space Shooter batch balancing runs")
+    parser.add_argument("--set", action="append", default=[], metavar="RULE=V1,V2",
+                        help=f"grid values for a rule (repeatable): {', '.join(Rules._fields)}")
+    parser.add_argument("--bot", choices=sorted(BOTS), default="dodger", help="policy at the controls")
+    parser.add_argument("--games", type=int, default=200, help="games per grid point")
+    parser.add_argument("--max-ticks", type=int, default=60 * 60 * 10, help="tick limit per game")
+    parser.add_argument("--seed", type=int, default=0, help="first seed; every point plays the same seeds")
+    parser.add_argument("--chunk", type=int, default=16, help="games per worker task")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--arrays", action="store_true", help="use the NumPy entity stores")
+    parser.add_argument("--out", help="append one JSON line per grid point here")
+    args = parser.parse_args()
+
+    grid = parse_grid(args.set)
+    points = grid_points(grid)
+    out = open(args.out, "a") if args.out else None
+    start = time.perf_counter()
+    ticks = 0
+    for rules, result in run_batch(points, args.bot, args.games, args.max_ticks, args.seed,
+                                   args.chunk, args.processes, args.arrays):
+        ticks += result["ticks"]["mean"] * result["games"]
+        label = " ".join(f"{name}={getattr(rules, name)}" for name in grid) or "defaults"
+        print(f"{label:<40} score {result['score']['mean']:8.1f}  ticks {result['ticks']['mean']:8.0f}  "
+              f"damage {result['damage']['mean']:7.0f}  over {result['game_over_rate']:6.1%}")
+        if out:
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    elapsed = time.perf_counter() - start
+    print(f"{len(points) * args.games} games, {ticks:.0f} ticks in {elapsed:.1f}s "
+          f"({ticks / elapsed:.0f} ticks/s on {args.processes} processes)")
+    if out:
+        out.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
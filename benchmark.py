@@ -0,0 +1,225 @@
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+# Run with the dummy video/audio drivers so benchmarks need no window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+import pygame
+
+from sim import Game, Controls, IDLE
+from render import Renderer
+
+# Stress-test benchmarks.
+# Each scenario drives a seeded Game plus a Renderer on the dummy display
+# through a scripted load, then reports ticks/s, GC activity and, separately
+# for update and draw, frame-time percentiles, allocated block growth and (in
+# a separate tracemalloc pass, so it doesn't skew timings) peak traced memory.
+# Results are JSON; --compare fails the run when a scenario regressed past
+# --threshold against an earlier result file.
+#
+#   python benchmark.py --out new.json --compare baseline.json
+
+SEED = 1234
+
+def keep_alive(game):
+    # Scenarios measure load, not game over
+    game.player.shield_active = True
+    game.player.shield_timer = 10 ** 9
+
+def fill_enemies(count):
+    def load(game, tick):
+        rng = game.rng
+        while len(game.enemies) < count:
+            enemy = game.enemy_pool.acquire(game.scale, game.width, rng)
+            enemy.y = enemy.prev_y = rng.uniform(-40 * game.scale, game.height)
+            game.enemies.append(enemy)
+    return load
+
+def bursts(per_tick):
+    def load(game, tick):
+        for _ in range(per_tick):
+            game.player.burst_shoot(game.bullets)
+    return load
+
+def explosions(per_tick):
+    def load(game, tick):
+        rng = game.rng
+        for _ in range(per_tick):
+            game.explosions.append(game.explosion_pool.acquire(rng.uniform(0, game.width), rng.uniform(0, game.height), game.scale))
+    return load
+
+def fill_powerups(count):
+    def load(game, tick):
+        rng = game.rng
+        while len(game.powerups) < count:
+            powerup = game.powerup_pool.acquire(game.scale, game.width, rng)
+            powerup.y = powerup.prev_y = rng.uniform(-40 * game.scale, game.height * 0.6)
+            game.powerups.append(powerup)
+    return load
+
+def combine(*loads):
+    def load(game, tick):
+        for step in loads:
+            step(game, tick)
+    return load
+
+SWEEP = Controls(shoot=True)
+
+# name -> (window size, per-tick load, controls)
+SCENARIOS = {
+    "enemies_1k": ((800, 600), fill_enemies(1000), SWEEP),
+    # Bullets live ~85 ticks, so 12 bursts (120 bullets) a tick keeps ~10k alive
+    "bullets_10k": ((800, 600), bursts(12), IDLE),
+    "explosion_storm": ((800, 600), combine(fill_enemies(50), explosions(60)), SWEEP),
+    "powerups_500": ((800, 600), fill_powerups(500), SWEEP),
+    "mixed_scale_0.5": ((400, 300), combine(fill_enemies(200), bursts(2), explosions(5)), SWEEP),
+    "mixed_scale_1": ((800, 600), combine(fill_enemies(200), bursts(2), explosions(5)), SWEEP),
+    "mixed_scale_2": ((1600, 1200), combine(fill_enemies(200), bursts(2), explosions(5)), SWEEP),
+}
+
+def percentiles(samples):
+    values = sorted(samples)
+    n = len(values)
+    pick = lambda q: values[min(n - 1, int(q * n))] * 1000
+    return {"avg": sum(values) / n * 1000, "p50": pick(0.50), "p95": pick(0.95),
+            "p99": pick(0.99), "max": values[-1] * 1000}
+
+PHASES = ("update", "draw")
+
+def update(game, load, controls, tick):
+    load(game, tick)
+    keep_alive(game)
+    game.update(controls)
+
+# samples: phase -> list of per-tick samples (see sample), or None to just run
+def run_ticks(game, renderer, load, controls, ticks, samples=None):
+    for tick in range(ticks):
+        if samples is None:
+            update(game, load, controls, tick)
+            renderer.draw(game, 1.0)
+        else:
+            sample(samples["update"], update, game, load, controls, tick)
+            sample(samples["draw"], renderer.draw, game, 1.0)
+
+# Runs one phase and appends (seconds, allocated block growth, peak traced
+# bytes above the phase's starting memory, or 0 when tracemalloc is off)
+def sample(samples, phase, *args):
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    phase(*args)
+    elapsed = time.perf_counter() - start
+    growth = sys.getallocatedblocks() - blocks
+    peak = tracemalloc.get_traced_memory()[1] - base if tracing else 0
+    samples.append((elapsed, growth, peak))
+
+# Block growth per phase: blocks_grown sums the ticks where the phase left
+# more blocks allocated than it started with (what pooling should keep near
+# zero), net_blocks is the overall change. A GC pass that runs inside a
+# phase also frees blocks other phases left behind, so one phase's net can go
+# negative while another's grows
+def block_stats(samples):
+    growth = [blocks for _, blocks, _ in samples]
+    grown = sum(blocks for blocks in growth if blocks > 0)
+    return {"blocks_grown": grown, "blocks_grown_per_tick": grown / len(growth), "net_blocks": sum(growth)}
+
+def setup(name, use_arrays, warmup):
+    size, load, controls = SCENARIOS[name]
+    game = Game(*size, use_arrays=use_arrays, seed=SEED)
+    renderer = Renderer(pygame.display.set_mode(size))
+    renderer.rng.seed(SEED)
+    run_ticks(game, renderer, load, controls, warmup)
+    return game, renderer, load, controls
+
+def run_scenario(name, ticks, warmup, use_arrays):
+    game, renderer, load, controls = setup(name, use_arrays, warmup)
+    samples = {phase: [] for phase in PHASES}
+    gc_before = [stats["collections"] for stats in gc.get_stats()]
+    blocks_before = sys.getallocatedblocks()
+    start = time.perf_counter()
+    run_ticks(game, renderer, load, controls, ticks, samples)
+    elapsed = time.perf_counter() - start
+    gc_after = [stats["collections"] for stats in gc.get_stats()]
+    result = {
+        "ticks": ticks,
+        "ticks_per_sec": ticks / elapsed,
+        "update_ms": percentiles([seconds for seconds, _, _ in samples["update"]]),
+        "draw_ms": percentiles([seconds for seconds, _, _ in samples["draw"]]),
+        "gc_collections": [after - before for before, after in zip(gc_before, gc_after)],
+        "allocated_blocks_delta": sys.getallocatedblocks() - blocks_before,
+        "memory": {phase: block_stats(samples[phase]) for phase in PHASES},
+        "entities": {"bullets": len(game.bullets), "enemies": len(game.enemies),
+                     "explosions": len(game.explosions), "powerups": len(game.powerups)},
+        "pools": game.pool_stats(),
+    }
+
+    # Memory pass on a fresh run: tracemalloc slows everything down
+    game, renderer, load, controls = setup(name, use_arrays, warmup)
+    samples = {phase: [] for phase in PHASES}
+    tracemalloc.start()
+    run_ticks(game, renderer, load, controls, min(ticks, 120), samples)
+    result["peak_traced_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    for phase in PHASES:
+        result["memory"][phase]["peak_kb"] = max(peak for _, _, peak in samples[phase]) / 1024
+    return result
+
+# Regressions: ticks/s dropping, or p95 update/draw time rising, by more than
+# threshold (a fraction) against the baseline
+def compare(results, baseline, threshold):
+    failures = []
+    for name, result in results["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if old is None:
+            continue
+        if result["ticks_per_sec"] < old["ticks_per_sec"] * (1 - threshold):
+            failures.append(f"{name}: ticks/s {old['ticks_per_sec']:.0f} -> {result['ticks_per_sec']:.0f}")
+        for phase in ("update_ms", "draw_ms"):
+            if result[phase]["p95"] > old[phase]["p95"] * (1 + threshold):
+                failures.append(f"{name}: {phase} p95 {old[phase]['p95']:.2f} -> {result[phase]['p95']:.2f}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Space Shooter stress-test benchmarks")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable, default all)")
+    parser.add_argument("--ticks", type=int, default=600, help="measured ticks per scenario")
+    parser.add_argument("--warmup", type=int, default=120, help="ticks to run before measuring")
+    parser.add_argument("--arrays", action="store_true", help="use the NumPy entity stores")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to check against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed regression fraction")
+    args = parser.parse_args()
+
+    pygame.init()
+    results = {"seed": SEED, "arrays": args.arrays, "ticks": args.ticks, "scenarios": {}}
+    for name in args.scenario or SCENARIOS:
+        result = results["scenarios"][name] = run_scenario(name, args.ticks, args.warmup, args.arrays)
+        print(f"{name:<18}{result['ticks_per_sec']:>9.0f} ticks/s  "
+              f"update p95 {result['update_ms']['p95']:7.2f} ms  draw p95 {result['draw_ms']['p95']:7.2f} ms  "
+              f"peak {result['peak_traced_kb']:8.0f} KiB  "
+              + "  ".join(f"{phase} +{memory['blocks_grown_per_tick']:.0f} blocks/tick {memory['peak_kb']:.0f} KiB"
+                          for phase, memory in result["memory"].items()))
+    pygame.quit()
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            failures = compare(results, json.load(f), args.threshold)
+        for failure in failures:
+            print("REGRESSION", failure)
+        return 1 if failures else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
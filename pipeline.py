@@ -0,0 +1,202 @@
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+
+from sim import Controls
+from snapshot import snapshot
+
+# Pipelined simulation.
+# The Game is updated on its own thread at the tick rate while the main thread
+# polls events, draws and presents. After every tick the sim thread publishes
+# an immutable Frame holding the tick's snapshot() bytes into a ring of
+# `buffers` slots (triple buffering by default); the main thread restores the
+# newest one into a Game of its own and draws that, so neither side waits on
+# or locks the other's state. Pygame releases the GIL while blitting, filling
+# and flipping, so a tick can run while a frame is being drawn.
+#
+# Input is sampled as late as possible: the main thread only hands over the
+# held controls and any pending presses, and each tick reads them just before
+# it updates. Anything else that changes the game (resizes, quality limits)
+# is posted and runs on the sim thread between ticks; a Recorder passed in is
+# fed there too.
+#
+# If a tick raises, the sim thread stops and the exception is re-raised on the
+# main thread by the next latest() or close().
+#
+# Two things are measured. Overlap is the share of sim work that ran while a
+# frame was being drawn or presented. Latency runs from the main thread seeing
+# an input to the end of presenting the first frame whose tick consumed it
+# (the display's own scan-out comes on top).
+
+# seq: publish order; due: when the tick was due, for interpolation;
+# input_at: earliest input this frame is the first to show, or None
+Frame = namedtuple("Frame", ["seq", "data", "due", "input_at"])
+
+class Pipeline:
+    def __init__(self, game, recorder=None, buffers=3, max_lag=0.25):
+        self.game = game
+        self.recorder = recorder
+        self.tick_time = 1.0 / game.tick_rate
+        self.max_lag = max_lag
+        self.frames = deque(maxlen=buffers)
+        self.events = deque()       # sound event names, for the main thread
+        self.commands = deque()     # (function, args) to run on the game
+        self.lock = threading.Lock()
+        self.held = (0, 0, False)
+        self.burst = self.restart = self.tapped_shoot = False
+        self.input_at = None
+        self.taken = 0              # seq of the newest frame the main thread took
+        self.spans = deque(maxlen=256)   # (start, end) of recent ticks
+        self.stopping = False
+        self.thread = None
+        self.error = None
+
+        self.frames.append(Frame(0, snapshot(game), time.perf_counter(), None))
+        self.seq = 0
+        self.sim_time = 0.0
+        self.presented_frames = 0
+        self.render_time = 0.0
+        self.overlap_time = 0.0
+        self.last_span = None
+        self.last_input_at = None
+        self.latencies = deque(maxlen=600)
+
+    def start(self):
+        # Ticks are short and must start on time; hand the GIL over more
+        # often than the default 5 ms so a busy main thread can't delay them
+        sys.setswitchinterval(min(sys.getswitchinterval(), self.tick_time / 4))
+        self.thread = threading.Thread(target=self.run, name="sim", daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.stopping = True
+        if self.thread is not None:
+            self.thread.join()
+        self.check()
+
+    def check(self):
+        if self.error is not None:
+            raise RuntimeError("simulation thread failed") from self.error
+
+    # Main thread side
+
+    def hold(self, dx, dy, shoot):
+        with self.lock:
+            if (dx, dy, shoot) != self.held:
+                self.held = (dx, dy, shoot)
+                if self.input_at is None:
+                    self.input_at = time.perf_counter()
+
+    def press(self, burst=False, restart=False, shoot=False):
+        with self.lock:
+            self.burst |= burst
+            self.restart |= restart
+            self.tapped_shoot |= shoot
+            if self.input_at is None:
+                self.input_at = time.perf_counter()
+
+    def post(self, change, *args):
+        self.commands.append((change, args))
+
+    def latest(self):
+        self.check()
+        frame = self.frames[-1]
+        self.taken = frame.seq
+        return frame
+
+    def take_events(self):
+        events = self.events
+        while events:
+            yield events.popleft()
+
+    # Interpolation between a frame's tick and the next, for frames drawn at now
+    def alpha(self, frame, now):
+        return min(max((now - frame.due) / self.tick_time, 0.0), 1.0)
+
+    # Call once a frame drawn from frame has been presented; start and end
+    # bound the drawing and presenting
+    def presented(self, frame, start, end):
+        self.presented_frames += 1
+        self.render_time += end - start
+        # Ticks still running when the last frame finished have ended by now
+        if self.last_span is not None:
+            self.overlap_time += self.sim_time_between(*self.last_span)
+        self.last_span = (start, end)
+        if frame.input_at is not None and frame.input_at != self.last_input_at:
+            self.latencies.append(end - frame.input_at)
+            self.last_input_at = frame.input_at
+
+    def sim_time_between(self, start, end):
+        return sum(max(0.0, min(end, span_end) - max(start, span_start))
+                   for span_start, span_end in list(self.spans))
+
+    @property
+    def overlap(self):
+        return self.overlap_time / self.sim_time if self.sim_time else 0.0
+
+    def report(self):
+        latencies = sorted(self.latencies)
+        lines = [
+            f"pipeline  {self.seq} ticks, {self.presented_frames} frames",
+            f"sim       {self.sim_time / max(self.seq, 1) * 1000:8.2f} ms/tick",
+            f"render    {self.render_time / max(self.presented_frames, 1) * 1000:8.2f} ms/frame",
+            f"overlap   {self.overlap:8.0%}  of sim work ran while a frame was drawing",
+        ]
+        if latencies:
+            n = len(latencies)
+            lines.append(f"latency   {sum(latencies) / n * 1000:8.1f} ms avg, "
+                         f"{latencies[min(n - 1, int(0.95 * n))] * 1000:.1f} ms p95, "
+                         f"{latencies[-1] * 1000:.1f} ms max (input to present, last {n})")
+        return lines
+
+    # Sim thread side
+
+    def run(self):
+        try:
+            self.loop()
+        except Exception as error:
+            self.error = error
+
+    def loop(self):
+        due = time.perf_counter()
+        while not self.stopping:
+            now = time.perf_counter()
+            if now < due:
+                time.sleep(due - now)
+                continue
+            # Too far behind to catch up: play in slow motion instead
+            if now - due > self.max_lag:
+                due = now
+            self.tick(due)
+            due += self.tick_time
+
+    def tick(self, due):
+        game = self.game
+        while self.commands:
+            change, args = self.commands.popleft()
+            change(game, *args)
+
+        with self.lock:
+            dx, dy, shoot = self.held
+            controls = Controls(dx, dy, shoot or self.tapped_shoot, self.burst, self.restart)
+            input_at = self.input_at
+            self.burst = self.restart = self.tapped_shoot = False
+            self.input_at = None
+
+        start = time.perf_counter()
+        if self.recorder: self.recorder.record(controls)
+        game.update(controls)
+        self.events.extend(game.events)
+        # Input consumed by frames the main thread skipped shows up first in
+        # this one
+        previous = self.frames[-1]
+        if previous.seq > self.taken and previous.input_at is not None:
+            input_at = previous.input_at if input_at is None else min(input_at, previous.input_at)
+        self.seq += 1
+        frame = Frame(self.seq, snapshot(game), due, input_at)
+        end = time.perf_counter()
+
+        self.frames.append(frame)
+        self.spans.append((start, end))
+        self.sim_time += end - start
@@ -0,0 +1,92 @@
+import csv
+import json
+import time
+from array import array
+
+# Per-phase frame profiler.
+# Each frame, named phases (and sub-phases like "update.enemies") are timed
+# with start/stop, and entity counts are recorded with count. Values go into a
+# fixed-size ring buffer per name, so memory stays flat however long the game
+# runs. Code that profiles keeps a reference that is None when profiling is
+# off, so the disabled cost is one truthiness check per phase.
+class Profiler:
+    def __init__(self, capacity=600):
+        self.capacity = capacity
+        self.frames = 0
+        self.times = {}     # phase -> ring of seconds per frame
+        self.counts = {}    # counter -> ring of values per frame
+        self.started = {}
+        self.current = {}
+        self.current_counts = {}
+
+    def start(self, name):
+        self.started[name] = time.perf_counter()
+
+    def stop(self, name):
+        elapsed = time.perf_counter() - self.started[name]
+        self.current[name] = self.current.get(name, 0.0) + elapsed
+
+    def count(self, name, value):
+        self.current_counts[name] = value
+
+    def _ring(self, rings, name):
+        ring = rings.get(name)
+        if ring is None:
+            ring = rings[name] = array("d", bytes(8 * self.capacity))
+        return ring
+
+    def end_frame(self):
+        slot = self.frames % self.capacity
+        for rings, values in ((self.times, self.current), (self.counts, self.current_counts)):
+            for name, ring in rings.items():
+                ring[slot] = 0.0
+            for name, value in values.items():
+                self._ring(rings, name)[slot] = value
+            values.clear()
+        self.frames += 1
+
+    # avg/p95/p99/max over the frames still in the ring
+    def stats(self, ring):
+        n = min(self.frames, self.capacity)
+        if n == 0:
+            return {"avg": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        values = sorted(ring[:n])
+        return {
+            "avg": sum(values) / n,
+            "p95": values[min(n - 1, int(0.95 * n))],
+            "p99": values[min(n - 1, int(0.99 * n))],
+            "max": values[-1],
+        }
+
+    def summary(self):
+        return {
+            "frames": self.frames,
+            "window": min(self.frames, self.capacity),
+            "phases_ms": {name: {key: value * 1000 for key, value in self.stats(ring).items()}
+                          for name, ring in sorted(self.times.items())},
+            "counts": {name: self.stats(ring) for name, ring in sorted(self.counts.items())},
+        }
+
+    # Overlay table: a header, then one row per phase (ms) and per counter
+    def rows(self):
+        summary = self.summary()
+        rows = [("phase (ms)", "avg", "p95", "p99")]
+        for name, stats in summary["phases_ms"].items():
+            rows.append((name, f"{stats['avg']:.2f}", f"{stats['p95']:.2f}", f"{stats['p99']:.2f}"))
+        for name, stats in summary["counts"].items():
+            rows.append((name, f"{stats['avg']:.0f}", f"{stats['p95']:.0f}", f"{stats['p99']:.0f}"))
+        return rows
+
+    # Writes the summary as JSON, or as CSV rows when path ends in .csv
+    def dump(self, path):
+        summary = self.summary()
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["kind", "name", "avg", "p95", "p99", "max"])
+                for kind, key in (("phase_ms", "phases_ms"), ("count", "counts")):
+                    for name, stats in summary[key].items():
+                        writer.writerow([kind, name] + [round(stats[k], 4) for k in ("avg", "p95", "p99", "max")])
+        else:
+            with open(path, "w") as f:
+                json.dump(summary, f, indent=2)
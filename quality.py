@@ -0,0 +1,75 @@
+from collections import deque, namedtuple
+
+from sim import Limits, NO_LIMITS
+
+# Quality levels and the governor that picks one.
+# Each level sets how much the frame costs: starfield density (share of
+# STARS, 0 for a plain black background), whether explosions, the shield and
+# touch buttons are alpha-blended or drawn as opaque stand-ins, and caps on
+# live entities. LEVELS runs from best to cheapest.
+Quality = namedtuple("Quality", ["name", "stars", "explosion_alpha", "shield_alpha", "button_alpha", "limits"])
+
+LEVELS = (
+    Quality("high", 1.0, True, True, True, NO_LIMITS),
+    Quality("medium", 0.6, True, True, False, Limits(enemies=150, powerups=20, explosions=100)),
+    Quality("low", 0.3, False, True, False, Limits(enemies=80, powerups=10, explosions=40)),
+    Quality("minimal", 0.0, False, False, False, Limits(enemies=40, powerups=5, explosions=20)),
+)
+
+def level_named(name):
+    for i, quality in enumerate(LEVELS):
+        if quality.name == name:
+            return i
+    raise ValueError(f"unknown quality level {name!r}")
+
+# Governor
+# Fed the work time of every frame (update and draw, not the frame cap's
+# sleep or a vsync wait). Once window frames are in, their p90 is checked
+# against the budget. Hysteresis keeps it from flip-flopping: it steps down a
+# level when the p90 exceeds degrade x budget and the current level has held
+# for degrade_hold frames, and only steps back up when the p90 falls under
+# recover x budget after recover_hold frames. Each change starts a fresh
+# window, so the new level is judged on its own frames.
+class Governor:
+    def __init__(self, budget, level=0, window=60, degrade=1.2, recover=0.7,
+                 degrade_hold=60, recover_hold=600):
+        self.budget = budget
+        self.level = level
+        self.degrade = degrade
+        self.recover = recover
+        self.degrade_hold = degrade_hold
+        self.recover_hold = recover_hold
+        self.samples = deque(maxlen=window)
+        self.held = 0
+        self.changes = 0
+        self.reason = "initial level"
+
+    @property
+    def quality(self):
+        return LEVELS[self.level]
+
+    # Returns True when the level changed
+    def sample(self, seconds):
+        self.samples.append(seconds)
+        self.held += 1
+        if len(self.samples) < self.samples.maxlen:
+            return False
+        p90 = sorted(self.samples)[int(0.9 * len(self.samples))]
+        if self.level < len(LEVELS) - 1 and self.held >= self.degrade_hold and p90 > self.budget * self.degrade:
+            self.change(self.level + 1, f"p90 frame {p90 * 1000:.1f} ms over {self.budget * self.degrade * 1000:.1f} ms")
+            return True
+        if self.level > 0 and self.held >= self.recover_hold and p90 < self.budget * self.recover:
+            self.change(self.level - 1, f"p90 frame {p90 * 1000:.1f} ms under {self.budget * self.recover * 1000:.1f} ms")
+            return True
+        return False
+
+    # One line: the current level, how often it changed and why it last did
+    def report(self):
+        return f"quality   {self.quality.name}, {self.changes} changes (last: {self.reason})"
+
+    def change(self, level, reason):
+        self.level = level
+        self.reason = f"{LEVELS[level].name}: {reason}"
+        self.changes += 1
+        self.held = 0
+        self.samples.clear()
@@ -0,0 +1,656 @@
+import random
+from collections import OrderedDict
+from operator import attrgetter
+import pygame
+from sim import BLACK, WHITE, RED, GREEN, BLUE, YELLOW, PURPLE, CYAN, POWERUP_COLORS, EXPLOSION_FRAMES, scale_for
+from sim import BASE_WIDTH, BASE_HEIGHT, EntityArray, np
+from quality import LEVELS
+
+# Rendering layer: draws a sim.Game onto a pygame surface. It only reads game
+# state; cosmetic state (stars, exhaust flicker) uses its own RNG so drawing
+# never changes the simulation.
+
+# Interpolated position of an entity between its previous and current tick
+def lerp(entity, alpha):
+    return (entity.prev_x + (entity.x - entity.prev_x) * alpha,
+            entity.prev_y + (entity.y - entity.prev_y) * alpha)
+
+# Fonts and text
+# Each font/size is loaded once for the life of the process; SysFont does a
+# system font lookup, far too slow to repeat per frame.
+_fonts = {}
+
+def get_font(size, name=None):
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.SysFont(name, size)
+    return font
+
+# Bounded LRU of rendered text surfaces. HUD labels keep the same text most
+# frames, so they are only re-rendered when their value actually changes.
+class TextCache:
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+
+    def render(self, text, color, size, name=None, antialias=True):
+        key = (name, size, text, color, antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        surface = self.surfaces[key] = get_font(size, name).render(text, antialias, color)
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surface
+
+# Star background
+# Stars are baked into a few screen-sized layers, far to near, each scrolling
+# down at its own speed and wrapping around with two blits. The cost per frame
+# is a handful of blits however many stars there are. The back layer is
+# opaque and doubles as the clear; front layers left without stars (at low
+# density) are skipped.
+STARS = 100   # at 800x600; scales with screen area
+STAR_LAYERS = (
+    # (share of stars, speed, min size, max size, min brightness, max brightness)
+    (0.5, 0.5, 0.5, 1.0, 150, 190),
+    (0.3, 1.0, 1.0, 1.5, 180, 225),
+    (0.2, 1.5, 1.5, 2.0, 210, 255),
+)
+
+class Starfield:
+    def __init__(self, width, height, scale, rng, count=None, like=None):
+        self.height = height
+        if count is None:
+            count = int(STARS * width * height / (800 * 600))
+        self.layers = []
+        for i, (share, speed, small, large, dim, bright) in enumerate(STAR_LAYERS):
+            if i > 0 and int(count * share) == 0:
+                continue
+            layer = pygame.Surface((width, height))
+            layer.fill(BLACK)
+            for _ in range(int(count * share)):
+                brightness = rng.randint(dim, bright)
+                pygame.draw.circle(layer, (brightness, brightness, brightness),
+                                   (rng.randint(0, width), rng.randint(0, height)),
+                                   rng.uniform(small, large) * scale)
+            if i > 0:
+                layer.set_colorkey(BLACK, pygame.RLEACCEL)
+            self.layers.append([_prepare(layer, like=like), speed * scale, 0.0])
+
+    def move(self, step=1.0):
+        for layer in self.layers:
+            layer[2] = (layer[2] + layer[1] * step) % self.height
+
+    def draw(self, surface):
+        for layer, _, offset in self.layers:
+            y = int(offset)
+            surface.blit(layer, (0, y))
+            surface.blit(layer, (0, y - self.height))
+
+# Touch Control Button
+class TouchButton:
+    def __init__(self, x, y, width, height, color, text="", alpha=150):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.color = color
+        self.text = text
+        self.alpha = alpha
+        self.rect = pygame.Rect(x, y, width, height)
+        self.translucent = True
+        self.background = None
+
+    # Opaque buttons are filled with the color they would show over black
+    def set_translucent(self, translucent):
+        self.translucent = translucent
+        self.background = None
+
+    def blits(self, scale, text_cache):
+        if self.background is None:
+            if self.translucent:
+                self.background = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+                self.background.fill((*self.color, self.alpha))
+            else:
+                self.background = _prepare(pygame.Surface((self.width, self.height)))
+                self.background.fill([c * self.alpha // 255 for c in self.color])
+        blits = [(self.background, (int(self.x), int(self.y)))]
+
+        if self.text:
+            text_surface = text_cache.render(self.text, WHITE, int(30 * scale))
+            text_rect = text_surface.get_rect(center=(self.x + self.width//2, self.y + self.height//2))
+            blits.append((text_surface, text_rect.topleft))
+        return blits
+
+    def draw(self, surface, scale, text_cache):
+        for blit in self.blits(scale, text_cache):
+            surface.blit(*blit)
+
+    def is_pressed(self, pos):
+        return self.rect.collidepoint(pos)
+
+# Sprite cache: every entity shape is rasterized once per scale into a surface
+# in the display's pixel format (or, with no display, the format of the
+# off-screen target passed as like), so drawing an entity is a single blit.
+# Shapes use a black colorkey (nothing we draw is black); only the translucent
+# shield needs per-pixel alpha. Entities keep the size they spawned at when
+# the window is resized, so the Renderer keeps one cache per entity scale.
+def _prepare(surface, alpha=False, like=None):
+    if pygame.display.get_surface() is None:
+        if like is None or alpha:
+            return surface
+        # convert() needs a display; copy into a surface in like's format
+        converted = pygame.Surface(surface.get_size(), 0, like)
+        converted.blit(surface, (0, 0))
+        key = surface.get_colorkey()
+        if key is not None:
+            converted.set_colorkey(key, pygame.RLEACCEL)
+        return converted
+    return surface.convert_alpha() if alpha else surface.convert()
+
+def _keyed(width, height):
+    s = pygame.Surface((max(1, int(width)), max(1, int(height))))
+    s.fill(BLACK)
+    s.set_colorkey(BLACK, pygame.RLEACCEL)
+    return s
+
+class SpriteCache:
+    def __init__(self, scale, like=None):
+        self.scale = scale
+
+        # Player ship and exhaust glow, one frame per flicker length
+        width, height = 50 * scale, 40 * scale
+        ship = _keyed(width + 1, height + 1)
+        pygame.draw.polygon(ship, BLUE, [(width // 2, 0), (0, height), (width, height)])
+        self.player = _prepare(ship, like=like)
+        self.glow_offset = width // 2 - (10 * scale)
+        self.glow = []
+        for glow_size in range(int(5 * scale), int(10 * scale) + 1):
+            glow = _keyed(20 * scale + 1, glow_size + 1)
+            pygame.draw.polygon(glow, YELLOW, [(0, 0), (10 * scale, glow_size), (20 * scale, 0)])
+            self.glow.append(_prepare(glow, like=like))
+
+        # Shield bubble
+        self.shield_radius = max(width, height) + (5 * scale)
+        shield = pygame.Surface((int(self.shield_radius*2), int(self.shield_radius*2)), pygame.SRCALPHA)
+        pygame.draw.circle(shield, (100, 200, 255, 150),
+                          (int(self.shield_radius), int(self.shield_radius)), int(self.shield_radius))
+        self.shield = _prepare(shield, alpha=True)
+        ring = _keyed(self.shield_radius * 2, self.shield_radius * 2)
+        pygame.draw.circle(ring, (100, 200, 255), (int(self.shield_radius), int(self.shield_radius)),
+                           int(self.shield_radius), max(1, int(2 * scale)))
+        self.shield_opaque = _prepare(ring, like=like)
+
+        # Bullet
+        self.bullet_radius = int(4 * scale)
+        bullet = _keyed(self.bullet_radius * 2 + 1, self.bullet_radius * 2 + 1)
+        pygame.draw.circle(bullet, GREEN, (self.bullet_radius, self.bullet_radius), self.bullet_radius)
+        self.bullet = _prepare(bullet, like=like)
+
+        # Enemy (opaque, no key needed)
+        width = height = 40 * scale
+        enemy = pygame.Surface((max(1, int(width)), max(1, int(height))))
+        enemy.fill(RED)
+        pygame.draw.rect(enemy, PURPLE, (5 * scale, 5 * scale, width - (10 * scale), height - (10 * scale)))
+        self.enemy = _prepare(enemy, like=like)
+
+        # Power-ups, one per type with its symbol
+        width = height = 30 * scale
+        self.powerups = {}
+        for kind, color in POWERUP_COLORS.items():
+            powerup = pygame.Surface((max(1, int(width)), max(1, int(height))))
+            powerup.fill(color)
+            if kind == "shield":
+                pygame.draw.circle(powerup, WHITE, (int(width//2), int(height//2)), int(8 * scale), int(2 * scale))
+            elif kind == "rapid_fire":
+                pygame.draw.polygon(powerup, WHITE, [
+                    (width//2, 8 * scale),
+                    (8 * scale, height - (8 * scale)),
+                    (width - (8 * scale), height - (8 * scale))
+                ])
+            elif kind == "health":
+                pygame.draw.rect(powerup, WHITE, (8 * scale, 8 * scale, width - (16 * scale), height - (16 * scale)))
+            self.powerups[kind] = _prepare(powerup, like=like)
+
+        # Explosion atlas: every frame of the timeline side by side in one
+        # strip; frame i is blitted with area self.explosion_frames[i]. The
+        # opaque atlas fades by darkening instead, which only matches the
+        # blended one over a black background, but blits much faster.
+        radii = [int(radius * scale) for radius, _ in EXPLOSION_FRAMES]
+        size = (max(1, sum(r * 2 + 1 for r in radii)), max(radii) * 2 + 1)
+        atlas = pygame.Surface(size, pygame.SRCALPHA)
+        opaque = _keyed(*size)
+        self.explosion_frames = []
+        left = 0
+        for r, (_, alpha) in zip(radii, EXPLOSION_FRAMES):
+            pygame.draw.circle(atlas, (*YELLOW, alpha), (left + r, r), r)
+            pygame.draw.circle(opaque, [c * alpha // 255 for c in YELLOW], (left + r, r), r)
+            self.explosion_frames.append((r, pygame.Rect(left, 0, r * 2 + 1, r * 2 + 1)))
+            left += r * 2 + 1
+        self.explosion = _prepare(atlas, alpha=True)
+        self.explosion_opaque = _prepare(opaque, like=like)
+
+# Dirty rectangles
+# In dirty-rect mode only the screen areas that changed are redrawn and passed
+# to pygame.display.update. Changed rects are snapped to DIRTY_TILE tiles and
+# merged into non-overlapping strips; past DIRTY_THRESHOLD of the screen a
+# full redraw and flip is cheaper.
+DIRTY_TILE = 32
+DIRTY_THRESHOLD = 0.5
+
+def blit_rect(blit):
+    image, dest = blit[0], blit[1]
+    return pygame.Rect(dest, blit[2].size if len(blit) > 2 else image.get_size())
+
+def merge_rects(rects, bounds, tile=DIRTY_TILE):
+    rows = {}
+    for rect in rects:
+        rect = rect.clip(bounds)
+        if not rect.w or not rect.h:
+            continue
+        columns = range(rect.left // tile, (rect.right - 1) // tile + 1)
+        for row in range(rect.top // tile, (rect.bottom - 1) // tile + 1):
+            rows.setdefault(row, set()).update(columns)
+
+    # Runs of tiles per row; a run with the same span as one on the row just
+    # above extends that rect downwards instead of starting a new one
+    merged = []
+    above = {}
+    for row in sorted(rows):
+        columns = sorted(rows[row])
+        runs = []
+        start = prev = columns[0]
+        for column in columns[1:]:
+            if column != prev + 1:
+                runs.append((start, prev))
+                start = column
+            prev = column
+        runs.append((start, prev))
+
+        current = {}
+        for run in runs:
+            rect = above.get(run)
+            if rect is not None and rect.bottom == row * tile:
+                rect.h += tile
+            else:
+                rect = pygame.Rect(run[0] * tile, row * tile, (run[1] - run[0] + 1) * tile, tile)
+                merged.append(rect)
+            current[run] = rect
+        above = current
+    return [rect.clip(bounds) for rect in merged]
+
+# Fixed logical resolution
+# With a Presenter, the Game and Renderer work at LOGICAL_SIZE whatever the
+# window size, and each frame is scaled to the window in one step at present
+# time, letterboxed to keep the aspect ratio. A window resize then only moves
+# the letterbox; sprites, fonts, stars and game geometry are untouched.
+# hardware=True has SDL scale on the GPU (pygame.SCALED), which also maps
+# mouse and (SDL 2.0.18+) touch coordinates to logical space itself.
+# Otherwise, or if SCALED is unavailable, frames are smoothscaled into the
+# window (SIMD-accelerated in pygame) and input is mapped here.
+LOGICAL_SIZE = (BASE_WIDTH, BASE_HEIGHT)
+
+class Presenter:
+    def __init__(self, window_size, flags=0, hardware=True, size=LOGICAL_SIZE):
+        self.size = size
+        self.hardware = hardware
+        if hardware:
+            try:
+                pygame.display.set_mode(size, flags | pygame.SCALED)
+            except pygame.error:
+                self.hardware = False
+        if not self.hardware:
+            pygame.display.set_mode(window_size, flags)
+        window = pygame.display.get_surface()
+        self.surface = window if self.hardware else _prepare(pygame.Surface(size))
+        self.resize()
+
+    # Call after the window changed size (and, in software mode, after set_mode)
+    def resize(self):
+        width, height = pygame.display.get_window_size() if self.hardware else pygame.display.get_surface().get_size()
+        logical_width, logical_height = self.size
+        scale = min(width / logical_width, height / logical_height)
+        view_width, view_height = max(1, round(logical_width * scale)), max(1, round(logical_height * scale))
+        self.window_size = (width, height)
+        self.view = pygame.Rect((width - view_width) // 2, (height - view_height) // 2, view_width, view_height)
+        if not self.hardware:
+            window = pygame.display.get_surface()
+            window.fill(BLACK)
+            self.target = window.subsurface(self.view)
+
+    def present(self):
+        if not self.hardware:
+            if self.view.size == self.size:
+                self.target.blit(self.surface, (0, 0))
+            else:
+                pygame.transform.smoothscale(self.surface, self.view.size, self.target)
+        pygame.display.flip()
+
+    # Window pixel position to logical position
+    def to_logical(self, pos):
+        if self.hardware:
+            return pos
+        view = self.view
+        return ((pos[0] - view.x) * self.size[0] / view.w, (pos[1] - view.y) * self.size[1] / view.h)
+
+    # Touch events carry positions normalized to 0..1
+    def finger_to_logical(self, x, y):
+        if self.hardware:
+            return x * self.size[0], y * self.size[1]
+        return self.to_logical((x * self.window_size[0], y * self.window_size[1]))
+
+# Render queue
+# Entities are queued as (sprite, dest) pairs grouped by sprite, back to front,
+# and the whole queue is submitted with one Surface.blits call. Positions are
+# interpolated straight from entity state: the NumPy stores do it for every
+# slot at once, lists in one tight loop. Anything whose sprite would land
+# fully outside the target (enemies and power-ups spawn above the top edge)
+# is culled before it is queued. where optionally masks a NumPy store's slots.
+def queue_sprites(blits, sprite, entities, alpha, bounds, offset=(0, 0), where=None):
+    width, height = bounds
+    sprite_width, sprite_height = sprite.get_size()
+    ox, oy = offset
+    if isinstance(entities, EntityArray):
+        n = entities.count
+        x, y, prev_x, prev_y = entities.x[:n], entities.y[:n], entities.prev_x[:n], entities.prev_y[:n]
+        x = (prev_x + (x - prev_x) * alpha).astype(int) + ox
+        y = (prev_y + (y - prev_y) * alpha).astype(int) + oy
+        visible = (x < width) & (x + sprite_width > 0) & (y < height) & (y + sprite_height > 0)
+        if where is not None:
+            visible &= where
+        blits.extend(zip([sprite] * int(visible.sum()), zip(x[visible].tolist(), y[visible].tolist())))
+        return
+    left, top = -sprite_width, -sprite_height
+    for entity in entities:
+        px, py = entity.prev_x, entity.prev_y
+        x = int(px + (entity.x - px) * alpha) + ox
+        y = int(py + (entity.y - py) * alpha) + oy
+        if left < x < width and top < y < height:
+            blits.append((sprite, (x, y)))
+
+# Entities split by the value of a size field, as (size, entities, where)
+# groups for queue_sprites; all one size (the usual case) is one group
+def size_groups(entities, field):
+    if isinstance(entities, EntityArray):
+        sizes = getattr(entities, field)[:entities.count]
+        unique = np.unique(sizes).tolist()
+        if len(unique) <= 1:
+            return [(size, entities, None) for size in unique]
+        return [(size, entities, sizes == size) for size in unique]
+    unique = set(map(attrgetter(field), entities))
+    if len(unique) <= 1:
+        return [(size, entities, None) for size in unique]
+    return [(size, [entity for entity in entities if getattr(entity, field) == size], None) for size in unique]
+
+def submit(surface, blits):
+    surface.blits(blits, doreturn=False)
+
+# Renderer
+# quality is a quality.Quality; set_quality switches it on the fly.
+class Renderer:
+    def __init__(self, surface, is_mobile=False, dirty=False, quality=LEVELS[0]):
+        self.is_mobile = is_mobile
+        self.dirty = dirty
+        self.quality = quality
+        self.profiler = None   # profiler.Profiler to time draw sub-phases
+        self.profile_rows = None
+        self.rng = random.Random()
+        self.last_time = 0.0
+        self.text = TextCache()
+        self.resize(surface)
+
+    # Rebuild everything that depends on the target size
+    def resize(self, surface):
+        self.surface = surface
+        self.width, self.height = surface.get_size()
+        self.scale = scale = scale_for(self.width, self.height)
+        self.font_size = int(36 * scale)
+        self.small_font_size = int(24 * scale)
+        self.overlay = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        self.overlay.fill((0, 0, 0, 150))
+        self.sprite_caches = {}
+        self.sprites = self.sprites_at(scale)
+        self.build_stars()
+        self.health_bars = {}
+
+        # Create touch controls for mobile
+        self.touch_controls = []
+        if self.is_mobile:
+            width, height = self.width, self.height
+            btn_size = 60 * scale
+            padding = 20 * scale
+
+            # Movement buttons (left side)
+            self.move_up = TouchButton(padding, height - btn_size*3 - padding*2, btn_size, btn_size, BLUE, "↑")
+            self.move_left = TouchButton(padding, height - btn_size*2 - padding, btn_size, btn_size, BLUE, "←")
+            self.move_down = TouchButton(padding, height - btn_size - padding, btn_size, btn_size, BLUE, "↓")
+            self.move_right = TouchButton(btn_size + padding*2, height - btn_size*2 - padding, btn_size, btn_size, BLUE, "→")
+
+            # Action buttons (right side)
+            self.shoot_btn = TouchButton(width - btn_size - padding, height - btn_size*2 - padding, btn_size, btn_size, RED, "FIRE")
+            self.burst_btn = TouchButton(width - btn_size*2 - padding*2, height - btn_size*2 - padding, btn_size, btn_size, GREEN, "BURST")
+
+            self.touch_controls.extend([
+                self.move_up, self.move_left, self.move_down, self.move_right,
+                self.shoot_btn, self.burst_btn
+            ])
+
+            # Restart button for game over
+            self.restart_btn = TouchButton(width//2 - 100*scale, height//2 + 50*scale, 200*scale, 60*scale, GREEN, "RESTART")
+            for button in self.touch_controls + [self.restart_btn]:
+                button.set_translucent(self.quality.button_alpha)
+
+    def build_stars(self):
+        count = int(STARS * self.width * self.height / (800 * 600) * self.quality.stars)
+        self.stars = Starfield(self.width, self.height, self.scale, self.rng, count, like=self.surface)
+        self.last_entities = None
+
+        # Dirty-rect mode keeps the starfield still, so the background can be
+        # restored piecewise from one pre-composed surface
+        if self.dirty:
+            self.background = _prepare(pygame.Surface((self.width, self.height)), like=self.surface)
+            self.stars.draw(self.background)
+
+    # Rebuilds only what the new level changes; the next frame is a full redraw
+    def set_quality(self, quality):
+        previous, self.quality = self.quality, quality
+        if quality.stars != previous.stars:
+            self.build_stars()
+        if quality.button_alpha != previous.button_alpha and self.is_mobile:
+            for button in self.touch_controls + [self.restart_btn]:
+                button.set_translucent(quality.button_alpha)
+        self.last_entities = None
+
+    # Sprites for entities of the given scale; caches for scales other than
+    # the window's are only built while entities of that size are on screen
+    # after a resize, and are dropped at the next one
+    def sprites_at(self, scale):
+        key = round(scale, 6)
+        sprites = self.sprite_caches.get(key)
+        if sprites is None:
+            sprites = self.sprite_caches[key] = SpriteCache(scale, like=self.surface)
+        return sprites
+
+    # Entity sprites as (surface, dest[, area]) blits, back to front
+    def entity_blits(self, game, alpha):
+        quality = self.quality
+        blits = []
+        for explosion in game.explosions:
+            sprites = self.sprites_at(explosion.scale)
+            atlas = sprites.explosion if quality.explosion_alpha else sprites.explosion_opaque
+            r, area = sprites.explosion_frames[explosion.frame]
+            blits.append((atlas, (int(explosion.x - r), int(explosion.y - r)), area))
+
+        player = game.player
+        sprites = self.sprites_at(player.scale)
+        x, y = lerp(player, alpha)
+        blits.append((sprites.player, (int(x), int(y))))
+        glow = sprites.glow[self.rng.randrange(len(sprites.glow))]
+        blits.append((glow, (int(x + sprites.glow_offset), int(y + player.height))))
+        if player.shield_active:
+            shield = sprites.shield if quality.shield_alpha else sprites.shield_opaque
+            blits.append((shield, (int(x + player.width//2 - sprites.shield_radius),
+                                           int(y + player.height//2 - sprites.shield_radius))))
+
+        # Sizes are 4, 40 and 30 times the scale each entity spawned at
+        bounds = (self.width, self.height)
+        for radius, bullets, where in size_groups(game.bullets, "radius"):
+            sprites = self.sprites_at(radius / 4)
+            r = sprites.bullet_radius
+            queue_sprites(blits, sprites.bullet, bullets, alpha, bounds, (-r, -r), where)
+        for width, enemies, where in size_groups(game.enemies, "width"):
+            queue_sprites(blits, self.sprites_at(width / 40).enemy, enemies, alpha, bounds, where=where)
+        for kind in POWERUP_COLORS:
+            powerups = [powerup for powerup in game.powerups if powerup.type == kind]
+            for width, group, _ in size_groups(powerups, "width"):
+                queue_sprites(blits, self.sprites_at(width / 30).powerups[kind], group, alpha, bounds)
+        return blits
+
+    # Health bar for one health value, built on first use
+    def health_bar(self, player):
+        key = (player.health, player.max_health)
+        bar = self.health_bars.get(key)
+        if bar is None:
+            scale = self.scale
+            width, height = int(200 * scale), int(20 * scale)
+            bar = pygame.Surface((width, height))
+            bar.fill(RED)
+            pygame.draw.rect(bar, GREEN, (0, 0, width * (player.health / player.max_health), height))
+            pygame.draw.rect(bar, WHITE, (0, 0, width, height), 2)
+            bar = self.health_bars[key] = _prepare(bar, like=self.surface)
+        return bar
+
+    # HUD and touch controls as (surface, dest) blits
+    def hud_blits(self, game):
+        scale, width = self.scale, self.width
+        player = game.player
+        margin = int(10 * scale)
+        blits = [(self.text.render(f"Score: {game.score}", WHITE, self.font_size), (margin, margin)),
+                 (self.health_bar(player), (margin, int(50 * scale)))]
+
+        lives_text = self.text.render(f"Lives: {player.lives}", WHITE, self.font_size)
+        blits.append((lives_text, (width - lives_text.get_width() - margin, margin)))
+
+        # Power-up status
+        if player.shield_active:
+            shield_text = self.text.render("Shield Active!", CYAN, self.small_font_size)
+            blits.append((shield_text, (width - shield_text.get_width() - margin, int(50 * scale))))
+        if player.rapid_fire:
+            rapid_text = self.text.render("Rapid Fire!", YELLOW, self.small_font_size)
+            blits.append((rapid_text, (width - rapid_text.get_width() - margin, int(75 * scale))))
+
+        # Touch controls for mobile
+        if self.is_mobile:
+            for control in self.touch_controls:
+                blits.extend(control.blits(scale, self.text))
+        return blits
+
+    def draw_game_over(self, game):
+        surface, width, height = self.surface, self.width, self.height
+
+        # Semi-transparent overlay
+        surface.blit(self.overlay, (0, 0))
+
+        game_over_text = self.text.render("GAME OVER", RED, self.font_size)
+        surface.blit(game_over_text, (width // 2 - game_over_text.get_width() // 2, height // 2 - 50))
+
+        score_text = self.text.render(f"Final Score: {game.score}", WHITE, self.font_size)
+        surface.blit(score_text, (width // 2 - score_text.get_width() // 2, height // 2))
+
+        if self.is_mobile:
+            self.restart_btn.draw(surface, self.scale, self.text)
+        else:
+            restart_text = self.text.render("Press R to Restart", GREEN, self.font_size)
+            surface.blit(restart_text, (width // 2 - restart_text.get_width() // 2, height // 2 + 50))
+
+    # Draws a frame and returns the list of changed rects to pass to
+    # pygame.display.update, or None when the whole surface should be flipped.
+    # alpha is how far the frame lies between the last two sim ticks (0..1).
+    def draw(self, game, alpha=1.0):
+        # Stars are purely cosmetic, so they scroll here rather than in the sim,
+        # by the game time elapsed since the last frame
+        now = (game.ticks + alpha) * game.step
+        elapsed = max(0.0, now - self.last_time)
+        self.last_time = now
+        if not game.game_over and not self.dirty:
+            self.stars.move(elapsed)
+
+        prof = self.profiler
+        if prof: prof.start("draw.build")
+        entities = self.entity_blits(game, alpha)
+        hud = self.hud_blits(game)
+        if prof: prof.stop("draw.build")
+
+        if prof: prof.start("draw.blit")
+        rects = None
+        if self.dirty and not game.game_over and self.last_entities is not None:
+            rects = self.draw_dirty(entities, hud)
+        if rects is None:
+            self.draw_full(game, entities, hud)
+        if prof: prof.stop("draw.blit")
+        return rects
+
+    def draw_full(self, game, entities, hud):
+        surface = self.surface
+
+        if self.dirty:
+            surface.blit(self.background, (0, 0))
+        else:
+            self.stars.draw(surface)
+        submit(surface, entities)
+        submit(surface, hud)
+        if game.game_over:
+            self.draw_game_over(game)
+            self.last_entities = None
+        elif self.dirty:
+            self.last_entities = [blit_rect(blit) for blit in entities]
+            self.last_hud = hud
+
+    # Profiler overlay table, re-rendered only when its rows change. It is
+    # drawn outside the tracked rects, so the next frame is a full redraw.
+    def draw_profile(self, rows):
+        if rows != self.profile_rows:
+            font = get_font(max(12, int(18 * self.scale)))
+            cells = [[font.render(cell, True, WHITE) for cell in row] for row in rows]
+            gap = int(12 * self.scale)
+            widths = [max(row[i].get_width() for row in cells) for i in range(len(cells[0]))]
+            line = font.get_linesize()
+            panel = pygame.Surface((sum(widths) + gap * len(widths), line * len(cells) + 12), pygame.SRCALPHA)
+            panel.fill((0, 0, 0, 180))
+            for r, row in enumerate(cells):
+                x = 6
+                for i, cell in enumerate(row):
+                    # Name column left-aligned, numbers right-aligned
+                    panel.blit(cell, (x if i == 0 else x + widths[i] - cell.get_width(), 6 + r * line))
+                    x += widths[i] + gap
+            self.profile_rows, self.profile_panel = rows, panel
+        self.surface.blit(self.profile_panel, (int(10 * self.scale), int(100 * self.scale)))
+        self.last_entities = None
+
+    # Dirty-rect path: restore the background under last frame's and this
+    # frame's entity rects (plus the HUD if it changed), redraw entities, and
+    # re-blit the HUD clipped to the restored areas so nothing blends twice.
+    # Returns None to fall back to a full redraw when too much changed.
+    def draw_dirty(self, entities, hud):
+        surface, background = self.surface, self.background
+        rects = [blit_rect(blit) for blit in entities]
+        dirty = self.last_entities + rects
+        if hud != self.last_hud:
+            dirty += [blit_rect(blit) for blit in self.last_hud] + [blit_rect(blit) for blit in hud]
+        self.last_entities, self.last_hud = rects, hud
+
+        merged = merge_rects(dirty, surface.get_rect())
+        if sum(r.w * r.h for r in merged) > DIRTY_THRESHOLD * self.width * self.height:
+            return None
+
+        for r in merged:
+            surface.blit(background, r, r)
+        submit(surface, entities)
+        for blit in hud:
+            for i in blit_rect(blit).collidelistall(merged):
+                surface.set_clip(merged[i])
+                surface.blit(*blit)
+        surface.set_clip(None)
+        return merged
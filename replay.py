@@ -0,0 +1,107 @@
+import struct
+import zlib
+
+from sim import Game, Controls, Limits
+
+# Input recording and headless replay.
+# A recording is the Game setup (seed, size, tick rate, store type) plus one
+# byte of Controls per tick, so replaying it through Game.update reproduces
+# the session exactly. File layout: HEADER, then the zlib-compressed stream.
+# Each stream byte packs dx+1 (bits 0-1), dy+1 (bits 2-3), shoot, burst and
+# restart (bits 4-6). A byte with bit 7 set is an escape instead: RESIZE is
+# followed by the new width and height as two little-endian uint16s, LIMITS
+# (version 2) by the enemy, power-up and explosion caps as three uint16s, with
+# NO_CAP standing for None.
+MAGIC = b"SSRP"
+VERSION = 2
+VERSIONS = (1, 2)   # readable
+HEADER = struct.Struct("<4sBBHHHQIq")   # magic, version, flags, tick rate, width, height, seed, ticks, final score
+RESIZE = 0x80
+RESIZE_SIZE = struct.Struct("<HH")
+LIMITS = 0x81
+LIMITS_SIZE = struct.Struct("<HHH")
+NO_CAP = 0xFFFF
+FLAG_ARRAYS = 1
+
+def pack_controls(controls):
+    return ((controls.dx + 1) | (controls.dy + 1) << 2 |
+            bool(controls.shoot) << 4 | bool(controls.burst) << 5 | bool(controls.restart) << 6)
+
+def unpack_controls(byte):
+    return Controls((byte & 3) - 1, (byte >> 2 & 3) - 1,
+                    bool(byte & 16), bool(byte & 32), bool(byte & 64))
+
+# Every possible input byte decoded once
+CONTROLS = [unpack_controls(byte) for byte in range(RESIZE)]
+
+class Recorder:
+    def __init__(self, game):
+        self.game = game
+        self.setup = (game.seed, game.width, game.height, game.tick_rate, game.use_arrays)
+        self.stream = bytearray()
+        self.ticks = 0
+
+    # Call with the Controls passed to each Game.update, in order
+    def record(self, controls):
+        self.stream.append(pack_controls(controls))
+        self.ticks += 1
+
+    # Call after Game.resize
+    def resize(self, width, height):
+        self.stream.append(RESIZE)
+        self.stream += RESIZE_SIZE.pack(width, height)
+
+    # Call after changing Game.limits
+    def limits(self, limits):
+        self.stream.append(LIMITS)
+        self.stream += LIMITS_SIZE.pack(*(NO_CAP if cap is None else cap for cap in limits))
+
+    def save(self, path):
+        seed, width, height, tick_rate, use_arrays = self.setup
+        flags = FLAG_ARRAYS if use_arrays else 0
+        header = HEADER.pack(MAGIC, VERSION, flags, tick_rate, width, height, seed, self.ticks, self.game.score)
+        with open(path, "wb") as f:
+            f.write(header)
+            f.write(zlib.compress(bytes(self.stream), 9))
+
+class Recording:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        (magic, version, flags, self.tick_rate, self.width, self.height,
+         self.seed, self.ticks, self.score) = HEADER.unpack_from(data)
+        if magic != MAGIC or version not in VERSIONS:
+            raise ValueError(f"{path} is not a version {VERSION} recording")
+        self.use_arrays = bool(flags & FLAG_ARRAYS)
+        self.stream = zlib.decompress(data[HEADER.size:])
+        self.played = 0
+
+    def new_game(self):
+        return Game(self.width, self.height, use_arrays=self.use_arrays,
+                    tick_rate=self.tick_rate, seed=self.seed)
+
+    # Feeds the stream through a fresh Game, as fast as possible, and returns
+    # it; played is the number of ticks fed, to check against ticks (the
+    # game's own tick count stops at game over and restarts from 0)
+    def play(self, game=None):
+        game = game or self.new_game()
+        stream, controls, update = self.stream, CONTROLS, game.update
+        i, n = 0, len(stream)
+        escapes = 0
+        while i < n:
+            byte = stream[i]
+            if byte == RESIZE:
+                game.resize(*RESIZE_SIZE.unpack_from(stream, i + 1))
+                i += 1 + RESIZE_SIZE.size
+                escapes += 1 + RESIZE_SIZE.size
+                continue
+            if byte == LIMITS:
+                caps = LIMITS_SIZE.unpack_from(stream, i + 1)
+                game.limits = Limits(*(None if cap == NO_CAP else cap for cap in caps))
+                i += 1 + LIMITS_SIZE.size
+                escapes += 1 + LIMITS_SIZE.size
+                continue
+            update(controls[byte])
+            i += 1
+        self.played = n - escapes
+        return game
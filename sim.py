@@ -0,0 +1,787 @@
+import random
+import math
+from collections import namedtuple
+
+# Simulation core: world state and rules only, no display, mixer or clock.
+# Everything here can be imported and stepped headless (see index.py --headless);
+# drawing lives in render.py and reads this state.
+
+# NumPy is optional: it only backs the array entity stores (see --arrays)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Colors
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+RED = (255, 50, 50)
+GREEN = (50, 255, 50)
+BLUE = (50, 150, 255)
+YELLOW = (255, 255, 0)
+PURPLE = (180, 70, 255)
+CYAN = (0, 255, 255)
+
+# Reference resolution the SCALE factor is measured against
+BASE_WIDTH, BASE_HEIGHT = 800, 600
+
+# Gameplay numbers (speeds, cooldowns, power-up durations, spawn chances) are
+# tuned per tick at REFERENCE_RATE. A Game can tick at any rate: each tick then
+# advances the world by step = REFERENCE_RATE / tick_rate reference ticks, so
+# play is the same in wall-clock time whatever the tick rate.
+REFERENCE_RATE = 60
+TICK_RATE = 60
+
+def scale_for(width, height):
+    return min(width / BASE_WIDTH, height / BASE_HEIGHT)
+
+# Per-tick player input. One of these drives each Game.update call.
+Controls = namedtuple("Controls", ["dx", "dy", "shoot", "burst", "restart"],
+                      defaults=[0, 0, False, False, False])
+IDLE = Controls()
+
+# Balance numbers a Game plays by: per-tick spawn chances, ram damage,
+# power-up durations (reference ticks) and health restored. Pass
+# Game(rules=Rules(...)) to try other values; the defaults are the real game.
+Rules = namedtuple("Rules", ["enemy_spawn", "powerup_spawn", "ram_damage",
+                             "shield_duration", "rapid_duration", "health_bonus"],
+                   defaults=[0.02, 0.005, 50, 500, 500, 100])
+DEFAULT_RULES = Rules()
+
+# Caps on live enemies, power-ups and explosions (None: no cap). Spawns and
+# explosions past a cap are skipped; the quality governor lowers these on
+# slow devices. They change play, so recordings log every change.
+Limits = namedtuple("Limits", ["enemies", "powerups", "explosions"], defaults=[None, None, None])
+NO_LIMITS = Limits()
+
+# Player
+class Player:
+    def __init__(self, bounds_width, bounds_height, scale, bullet_pool=None):
+        self.scale = scale
+        self.bullet_pool = bullet_pool or Pool(Bullet)
+        self.bounds = (bounds_width, bounds_height)
+        self.width = 50 * scale
+        self.height = 40 * scale
+        self.x = bounds_width // 2 - self.width // 2
+        self.y = bounds_height - self.height - (20 * scale)
+        self.prev_x, self.prev_y = self.x, self.y
+        self.speed = 5 * scale
+        self.color = BLUE
+        self.shoot_cooldown = 0
+        self.health = 500
+        self.max_health = 500
+        self.lives = 3
+        self.rapid_fire = False
+        self.rapid_timer = 0
+        self.shield_active = False
+        self.shield_timer = 0
+
+    def move(self, dx, dy, step=1.0):
+        self.prev_x, self.prev_y = self.x, self.y
+        self.x = max(0, min(self.bounds[0] - self.width, self.x + dx * self.speed * step))
+        self.y = max(0, min(self.bounds[1] - self.height, self.y + dy * self.speed * step))
+
+    # Timers count reference ticks, so they run down by step each tick
+    def update(self, step=1.0):
+        if self.shoot_cooldown > 0:
+            self.shoot_cooldown -= step
+        if self.rapid_fire:
+            self.rapid_timer -= step
+            if self.rapid_timer <= 0:
+                self.rapid_fire = False
+
+        # Update shield timer
+        if self.shield_active:
+            self.shield_timer -= step
+            if self.shield_timer <= 0:
+                self.shield_active = False
+
+    # Activate shield power-up
+    def activate_shield(self, duration=500):
+        self.shield_active = True
+        self.shield_timer = duration
+
+    # Normal single bullet shoot
+    def shoot(self, bullets):
+        if self.shoot_cooldown <= 0:
+            bullets.append(self.bullet_pool.acquire(self.x + self.width // 2, self.y, self.scale))
+            self.shoot_cooldown = 5 if self.rapid_fire else 15
+            return True
+        return False
+
+    # Burst fire: 10 bullets at once
+    def burst_shoot(self, bullets):
+        acquire = self.bullet_pool.acquire
+        for i in range(10):
+            bullets.append(acquire(self.x + self.width // 2, self.y - i * (10 * self.scale), self.scale))
+
+# Entities are short-lived and numerous, so they are slotted and recycled
+# through a Pool: reset() reinitializes one in place with the constructor's
+# arguments, and __init__ is just the first reset.
+
+# Bullet
+class Bullet:
+    __slots__ = ("x", "y", "prev_x", "prev_y", "radius", "speed")
+    color = GREEN
+
+    def __init__(self, x, y, scale):
+        self.reset(x, y, scale)
+
+    def reset(self, x, y, scale):
+        self.x = x
+        self.y = y
+        self.prev_x, self.prev_y = x, y
+        self.radius = 4 * scale
+        self.speed = 7 * scale
+
+    def move(self, step=1.0):
+        self.prev_x, self.prev_y = self.x, self.y
+        self.y -= self.speed * step
+
+    def off_screen(self):
+        return self.y < 0
+
+# Enemy
+class Enemy:
+    __slots__ = ("width", "height", "x", "y", "prev_x", "prev_y", "speed",
+                 "direction", "oscillation_speed", "sway")
+    color = RED
+
+    def __init__(self, scale, bounds_width, rng=random):
+        self.reset(scale, bounds_width, rng)
+
+    def reset(self, scale, bounds_width, rng=random):
+        self.width = 40 * scale
+        self.height = 40 * scale
+        self.x = rng.randint(int(20 * scale), int(bounds_width - self.width - (20 * scale)))
+        self.y = rng.randint(int(-100 * scale), int(-40 * scale))
+        self.prev_x, self.prev_y = self.x, self.y
+        self.speed = rng.uniform(1.0, 3.0) * scale
+        self.direction = rng.choice([-1, 1])
+        self.oscillation_speed = rng.uniform(0.5, 1.5)
+        self.sway = 2 * scale
+
+    def move(self, time_ms, step=1.0):
+        self.prev_x, self.prev_y = self.x, self.y
+        self.y += self.speed * step
+        self.x += math.sin(time_ms * 0.001 * self.oscillation_speed) * self.direction * self.sway * step
+
+    def off_screen(self, bounds_height):
+        return self.y > bounds_height
+
+    def collides_with(self, bullet):
+        return (self.x < bullet.x < self.x + self.width and
+                self.y < bullet.y < self.y + self.height)
+
+    def collides_with_player(self, player):
+        return (self.x < player.x + player.width and
+                self.x + self.width > player.x and
+                self.y < player.y + player.height and
+                self.y + self.height > player.y)
+
+# Power-up class
+POWERUP_TYPES = ("shield", "rapid_fire", "health")
+POWERUP_COLORS = {
+    "shield": CYAN,
+    "rapid_fire": YELLOW,
+    "health": GREEN
+}
+
+class PowerUp:
+    __slots__ = ("width", "height", "x", "y", "prev_x", "prev_y", "speed", "type")
+    colors = POWERUP_COLORS
+
+    def __init__(self, scale, bounds_width, rng=random):
+        self.reset(scale, bounds_width, rng)
+
+    def reset(self, scale, bounds_width, rng=random):
+        self.width = 30 * scale
+        self.height = 30 * scale
+        self.x = rng.randint(int(20 * scale), int(bounds_width - self.width - (20 * scale)))
+        self.y = rng.randint(int(-100 * scale), int(-40 * scale))
+        self.prev_x, self.prev_y = self.x, self.y
+        self.speed = 2.0 * scale
+        self.type = rng.choice(POWERUP_TYPES)
+
+    def move(self, step=1.0):
+        self.prev_x, self.prev_y = self.x, self.y
+        self.y += self.speed * step
+
+    def off_screen(self, bounds_height):
+        return self.y > bounds_height
+
+    def collides_with_player(self, player):
+        return (self.x < player.x + player.width and
+                self.x + self.width > player.x and
+                self.y < player.y + player.height and
+                self.y + self.height > player.y)
+
+# Explosion
+# The fireball grows by 2 a tick from radius 5 to 30, then fades out by 15
+# alpha a tick. That timeline is fixed, so it is computed once at scale 1:
+# EXPLOSION_FRAMES[i] is (radius, alpha) after i reference ticks. An explosion
+# only advances its age; render.py bakes the frames into a per-scale atlas.
+def _explosion_frames():
+    radius, alpha = 5, 255
+    frames = []
+    while alpha > 0:
+        frames.append((radius, alpha))
+        if radius < 30:
+            radius += 2
+        else:
+            alpha -= 15
+    return tuple(frames)
+
+EXPLOSION_FRAMES = _explosion_frames()
+
+class Explosion:
+    __slots__ = ("x", "y", "scale", "age")
+
+    def __init__(self, x, y, scale):
+        self.reset(x, y, scale)
+
+    def reset(self, x, y, scale):
+        self.x = x
+        self.y = y
+        self.scale = scale
+        self.age = 0.0
+
+    @property
+    def frame(self):
+        return min(int(self.age), len(EXPLOSION_FRAMES) - 1)
+
+    def update(self, step=1.0):
+        self.age += step
+
+    def is_done(self):
+        return self.age >= len(EXPLOSION_FRAMES)
+
+# Free-list pool for one entity class. acquire() takes the constructor's
+# arguments and resets a pooled instance when there is one (a hit), else
+# builds a new one (a miss). release() keeps up to capacity instances for
+# reuse; anything beyond that is dropped to the garbage collector. high_water
+# is the most instances out at once, the capacity that would make every
+# acquire a hit. An entity must not be used after it is released.
+class Pool:
+    def __init__(self, kind, capacity=1024):
+        self.kind = kind
+        self.capacity = capacity
+        self.free = []
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+        self.in_use = 0
+        self.high_water = 0
+
+    def acquire(self, *args):
+        self.in_use += 1
+        if self.in_use > self.high_water:
+            self.high_water = self.in_use
+        if self.free:
+            self.hits += 1
+            entity = self.free.pop()
+            entity.reset(*args)
+            return entity
+        self.misses += 1
+        return self.kind(*args)
+
+    # n instances whose fields the caller sets itself (snapshot restore)
+    def take(self, n):
+        self.in_use += n
+        if self.in_use > self.high_water:
+            self.high_water = self.in_use
+        free = self.free
+        hits = min(n, len(free))
+        entities = free[len(free) - hits:]
+        del free[len(free) - hits:]
+        self.hits += hits
+        self.misses += n - hits
+        kind = self.kind
+        entities += [kind.__new__(kind) for _ in range(n - hits)]
+        return entities
+
+    def release(self, entity):
+        self.in_use -= 1
+        if len(self.free) < self.capacity:
+            self.free.append(entity)
+        else:
+            self.dropped += 1
+
+    def release_all(self, entities):
+        n = len(entities)
+        self.in_use -= n
+        room = self.capacity - len(self.free)
+        if n > room:
+            self.dropped += n - room
+            entities = entities[:room]
+        self.free.extend(entities)
+
+    def stats(self):
+        acquired = self.hits + self.misses
+        return {"capacity": self.capacity, "free": len(self.free), "in_use": self.in_use,
+                "high_water": self.high_water, "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / acquired if acquired else 0.0, "dropped": self.dropped}
+
+# Spatial hash broadphase: uniform grid of cells, each holding the items whose
+# bounding box overlaps it. Rebuilt every tick, so lookups only touch nearby items.
+GRID_CELL = 64
+
+class SpatialHash:
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def clear(self):
+        self.cells.clear()
+
+    def _span(self, lo, hi):
+        return range(int(lo // self.cell_size), int(hi // self.cell_size) + 1)
+
+    def insert(self, item, x, y, width=0, height=0):
+        for cx in self._span(x, x + width):
+            for cy in self._span(y, y + height):
+                bucket = self.cells.get((cx, cy))
+                if bucket is None:
+                    self.cells[(cx, cy)] = [item]
+                else:
+                    bucket.append(item)
+
+    def query(self, x, y, width=0, height=0):
+        found = set()
+        for cx in self._span(x, x + width):
+            for cy in self._span(y, y + height):
+                bucket = self.cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        return found
+
+# Array-backed entity stores (struct-of-arrays). Bullets and enemies live in
+# contiguous NumPy arrays so moving, culling and hit testing run as one
+# vectorized step per tick. The stores behave like the lists they replace:
+# append() takes a regular Bullet/Enemy and iterating yields thin views whose
+# attributes read and write the arrays. Views are only valid until the next
+# compact(), which drops dead slots in bulk and keeps the survivors in order.
+class EntityArray:
+    fields = ()
+    view = None
+
+    def __init__(self, capacity=256, pool=None):
+        self.pool = pool   # appended entities are copied in, then released here
+        self.count = 0
+        self.alive = np.zeros(capacity, dtype=bool)
+        for name in self.fields:
+            setattr(self, name, np.zeros(capacity))
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if not -self.count <= i < self.count:
+            raise IndexError(i)
+        return self.view(self, i % self.count)
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self.view(self, i)
+
+    def _grow(self):
+        capacity = len(self.alive) * 2
+        self.alive = np.resize(self.alive, capacity)
+        for name in self.fields:
+            setattr(self, name, np.resize(getattr(self, name), capacity))
+
+    def append(self, entity):
+        if self.count == len(self.alive):
+            self._grow()
+        i = self.count
+        for name in self.fields:
+            getattr(self, name)[i] = getattr(entity, name)
+        self.alive[i] = True
+        self.count += 1
+        if self.pool is not None:
+            self.pool.release(entity)
+
+    def compact(self):
+        n = self.count
+        keep = np.flatnonzero(self.alive[:n])
+        if len(keep) == n:
+            return
+        for name in self.fields:
+            arr = getattr(self, name)
+            arr[:len(keep)] = arr[keep]
+        self.alive[:len(keep)] = True
+        self.alive[len(keep):n] = False
+        self.count = len(keep)
+
+def _slot_property(name):
+    return property(lambda self: getattr(self._store, name)[self._slot].item(),
+                    lambda self, value: getattr(self._store, name).__setitem__(self._slot, value))
+
+class BulletView(Bullet):
+    __slots__ = ("_store", "_slot")
+    x = _slot_property("x")
+    y = _slot_property("y")
+    prev_x = _slot_property("prev_x")
+    prev_y = _slot_property("prev_y")
+    radius = _slot_property("radius")
+    speed = _slot_property("speed")
+
+    def __init__(self, store, slot):
+        self._store = store
+        self._slot = slot
+
+class EnemyView(Enemy):
+    __slots__ = ("_store", "_slot")
+    x = _slot_property("x")
+    y = _slot_property("y")
+    prev_x = _slot_property("prev_x")
+    prev_y = _slot_property("prev_y")
+    width = _slot_property("width")
+    height = _slot_property("height")
+    speed = _slot_property("speed")
+    direction = _slot_property("direction")
+    oscillation_speed = _slot_property("oscillation_speed")
+    sway = _slot_property("sway")
+
+    def __init__(self, store, slot):
+        self._store = store
+        self._slot = slot
+
+class BulletArray(EntityArray):
+    fields = ("x", "y", "prev_x", "prev_y", "radius", "speed")
+    view = BulletView
+
+    def move(self, step=1.0):
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        self.y[:n] -= self.speed[:n] * step
+        self.alive[:n] &= self.y[:n] >= 0
+
+class EnemyArray(EntityArray):
+    fields = ("x", "y", "prev_x", "prev_y", "width", "height", "speed", "direction", "oscillation_speed", "sway")
+    view = EnemyView
+
+    def move(self, time_ms, bounds_height, step=1.0):
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        self.y[:n] += self.speed[:n] * step
+        self.x[:n] += np.sin(time_ms * 0.001 * self.oscillation_speed[:n]) * self.direction[:n] * self.sway[:n] * step
+        self.alive[:n] &= self.y[:n] <= bounds_height
+
+    # Same strict AABB test as Enemy.collides_with, for every enemy at once.
+    # Bullets are binned into GRID_CELL cells and sorted by cell, so each
+    # enemy only gathers the bullets in the cells it overlaps (usually at most
+    # 2x2, more for enemies spawned before a resize shrank the cells).
+    # Returns (enemy, bullet) slot pairs; each enemy takes the first bullet in
+    # slot order that no earlier enemy already used, like the list path.
+    def hits(self, bullets, cell_size):
+        n, m = self.count, bullets.count
+        if n == 0 or m == 0:
+            return []
+        bx, by = bullets.x[:m], bullets.y[:m]
+        ex, ey = self.x[:n], self.y[:n]
+        ew, eh = self.width[:n], self.height[:n]
+
+        bcx = np.floor(bx / cell_size).astype(np.int64)
+        bcy = np.floor(by / cell_size).astype(np.int64)
+        ox, oy = bcx.min(), bcy.min()
+        span = bcy.max() - oy + 3
+        bkey = (bcx - ox) * span + (bcy - oy)
+        order = np.argsort(bkey, kind="stable")
+        sorted_keys = bkey[order]
+
+        cx0 = np.floor(ex / cell_size).astype(np.int64)
+        cy0 = np.floor(ey / cell_size).astype(np.int64)
+        cx1 = np.floor((ex + ew) / cell_size).astype(np.int64)
+        cy1 = np.floor((ey + eh) / cell_size).astype(np.int64)
+        owners, keys = [], []
+        for dx in range(int((cx1 - cx0).max()) + 1):
+            for dy in range(int((cy1 - cy0).max()) + 1):
+                cx, cy = cx0 + dx, cy0 + dy
+                valid = (cx <= cx1) & (cy <= cy1) & (cy - oy >= 0) & (cy - oy < span)
+                owners.append(np.flatnonzero(valid))
+                keys.append(((cx - ox) * span + (cy - oy))[valid])
+        owners = np.concatenate(owners)
+        keys = np.concatenate(keys)
+        lo = np.searchsorted(sorted_keys, keys, side="left")
+        hi = np.searchsorted(sorted_keys, keys, side="right")
+        counts = hi - lo
+        total = counts.sum()
+        if total == 0:
+            return []
+        enemy = np.repeat(owners, counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        bullet = order[np.repeat(lo, counts) + offsets]
+
+        inside = ((ex[enemy] < bx[bullet]) & (bx[bullet] < ex[enemy] + ew[enemy]) &
+                  (ey[enemy] < by[bullet]) & (by[bullet] < ey[enemy] + eh[enemy]) &
+                  self.alive[enemy] & bullets.alive[bullet])
+        enemy, bullet = enemy[inside], bullet[inside]
+        pairs = []
+        spent = set()
+        taken = -1
+        for i in np.lexsort((bullet, enemy)):
+            e, b = int(enemy[i]), int(bullet[i])
+            if e == taken or b in spent:
+                continue
+            pairs.append((e, b))
+            spent.add(b)
+            taken = e
+        return pairs
+
+    def touching(self, player):
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        mask = (self.alive[:n] &
+                (x < player.x + player.width) & (x + self.width[:n] > player.x) &
+                (y < player.y + player.height) & (y + self.height[:n] > player.y))
+        return np.flatnonzero(mask).tolist()
+
+# Game
+# Steps the world one tick at a time from explicit Controls. Sounds the front
+# end should play for the last tick are left as names in self.events.
+# All randomness comes from self.rng, seeded from seed (random when None), so
+# the same seed and Controls sequence always replay the same game. Any int
+# works; it is folded into 64 bits first, so recordings can store it.
+class Game:
+    def __init__(self, width=BASE_WIDTH, height=BASE_HEIGHT, use_arrays=False, tick_rate=TICK_RATE, seed=None,
+                 rules=DEFAULT_RULES):
+        self.seed = seed % 2 ** 64 if seed is not None else random.randrange(2 ** 64)
+        self.rng = random.Random(self.seed)
+        self.use_arrays = use_arrays
+        self.tick_rate = tick_rate
+        self.rules = rules
+        self.limits = NO_LIMITS
+        self.profiler = None   # profiler.Profiler to time update sub-phases
+        self.step = REFERENCE_RATE / tick_rate
+        self.events = []
+        self.pools = {"bullets": Pool(Bullet, 4096), "enemies": Pool(Enemy, 512),
+                      "powerups": Pool(PowerUp, 128), "explosions": Pool(Explosion, 512)}
+        self.bullet_pool = self.pools["bullets"]
+        self.enemy_pool = self.pools["enemies"]
+        self.powerup_pool = self.pools["powerups"]
+        self.explosion_pool = self.pools["explosions"]
+        self.resize(width, height)
+        self.reset()
+
+    def resize(self, width, height):
+        self.width, self.height = width, height
+        self.scale = scale_for(width, height)
+        self.bullet_grid = SpatialHash(GRID_CELL * self.scale)
+        self.body_grid = SpatialHash(GRID_CELL * self.scale)
+        if hasattr(self, "player"):
+            self.player.bounds = (width, height)
+
+    # Hands every live entity back to its pool
+    def release_entities(self):
+        if not self.use_arrays:
+            self.bullet_pool.release_all(self.bullets)
+            self.enemy_pool.release_all(self.enemies)
+        self.powerup_pool.release_all(self.powerups)
+        self.explosion_pool.release_all(self.explosions)
+
+    # Restarting recycles every live entity
+    def reset(self):
+        if hasattr(self, "player"):
+            self.release_entities()
+        self.player = Player(self.width, self.height, self.scale, self.bullet_pool)
+        if self.use_arrays:
+            self.bullets = BulletArray(pool=self.bullet_pool)
+            self.enemies = EnemyArray(pool=self.enemy_pool)
+        else:
+            self.bullets = []
+            self.enemies = []
+        self.powerups = []
+        self.explosions = []
+        self.score = 0
+        self.ticks = 0
+        self.damage_taken = 0
+        self.game_over = False
+
+    def explode(self, x, y):
+        cap = self.limits.explosions
+        if cap is None or len(self.explosions) < cap:
+            self.explosions.append(self.explosion_pool.acquire(x, y, self.scale))
+
+    def pool_stats(self):
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+    # Drops the entities dead says are finished, releasing them to pool
+    @staticmethod
+    def _sweep(entities, dead, pool):
+        survivors = []
+        for entity in entities:
+            if dead(entity):
+                pool.release(entity)
+            else:
+                survivors.append(entity)
+        return survivors
+
+    def update_lists(self):
+        for bullet in self.bullets:
+            bullet.move(self.step)
+        self.bullets = self._sweep(self.bullets, Bullet.off_screen, self.bullet_pool)
+
+        # Bucket bullets by index so each enemy only tests its neighbours
+        self.bullet_grid.clear()
+        for i, bullet in enumerate(self.bullets):
+            self.bullet_grid.insert(i, bullet.x, bullet.y)
+
+        spent = set()
+        survivors = []
+        time_ms = self.time_ms()
+        release = self.enemy_pool.release
+        for enemy in self.enemies:
+            enemy.move(time_ms, self.step)
+            if enemy.off_screen(self.height):
+                release(enemy)
+                continue
+
+            # Check collision with bullets (first bullet in list order wins, as before)
+            hit = None
+            for i in self.bullet_grid.query(enemy.x, enemy.y, enemy.width, enemy.height):
+                if i not in spent and (hit is None or i < hit) and enemy.collides_with(self.bullets[i]):
+                    hit = i
+            if hit is not None:
+                spent.add(hit)
+                self.explode(enemy.x + enemy.width//2, enemy.y + enemy.height//2)
+                self.score += 10
+                self.events.append("explosion")
+                release(enemy)
+                continue
+            survivors.append(enemy)
+        self.enemies = survivors
+        if spent:
+            for i in spent:
+                self.bullet_pool.release(self.bullets[i])
+            self.bullets = [bullet for i, bullet in enumerate(self.bullets) if i not in spent]
+
+    def update_arrays(self):
+        self.bullets.move(self.step)
+        self.enemies.move(self.time_ms(), self.height, self.step)
+        for e, b in self.enemies.hits(self.bullets, GRID_CELL * self.scale):
+            x = self.enemies.x[e] + self.enemies.width[e] // 2
+            y = self.enemies.y[e] + self.enemies.height[e] // 2
+            self.explode(float(x), float(y))
+            self.score += 10
+            self.events.append("explosion")
+            self.enemies.alive[e] = False
+            self.bullets.alive[b] = False
+        self.bullets.compact()
+        self.enemies.compact()
+
+    def time_ms(self):
+        return self.ticks * 1000 / self.tick_rate
+
+    def update(self, controls=IDLE):
+        self.events.clear()
+        if self.game_over:
+            if controls.restart:
+                self.reset()
+            return
+
+        # Apply input
+        player = self.player
+        if controls.burst:
+            player.burst_shoot(self.bullets)
+            self.events.append("shoot")
+        player.move(controls.dx, controls.dy, self.step)
+        if controls.shoot and player.shoot(self.bullets):
+            self.events.append("shoot")
+
+        self.ticks += 1
+        player.update(self.step)
+        prof = self.profiler
+
+        # Update bullets and enemies, resolving bullet hits
+        if prof: prof.start("update.combat")
+        if self.use_arrays:
+            self.update_arrays()
+        else:
+            self.update_lists()
+        if prof: prof.stop("update.combat")
+
+        # Update power-ups
+        if prof: prof.start("update.powerups")
+        for powerup in self.powerups:
+            powerup.move(self.step)
+        height = self.height
+        self.powerups = self._sweep(self.powerups, lambda powerup: powerup.off_screen(height), self.powerup_pool)
+        if prof: prof.stop("update.powerups")
+
+        # Check collisions with player
+        rules = self.rules
+        if prof: prof.start("update.player_hits")
+        self.body_grid.clear()
+        if not self.use_arrays:
+            for i, enemy in enumerate(self.enemies):
+                self.body_grid.insert((0, i), enemy.x, enemy.y, enemy.width, enemy.height)
+        for i, powerup in enumerate(self.powerups):
+            self.body_grid.insert((1, i), powerup.x, powerup.y, powerup.width, powerup.height)
+        touched = sorted(self.body_grid.query(player.x, player.y, player.width, player.height))
+
+        if self.use_arrays:
+            rammed = self.enemies.touching(player)
+        else:
+            rammed = [i for kind, i in touched if kind == 0 and self.enemies[i].collides_with_player(player)]
+        for i in rammed:
+            enemy = self.enemies[i]
+            if not player.shield_active:
+                player.health -= rules.ram_damage
+                self.damage_taken += rules.ram_damage
+                if player.health <= 0:
+                    player.lives -= 1
+                    player.health = player.max_health
+                    if player.lives <= 0:
+                        self.game_over = True
+            self.explode(enemy.x + enemy.width//2, enemy.y + enemy.height//2)
+            self.events.append("explosion")
+        if rammed and self.use_arrays:
+            self.enemies.alive[rammed] = False
+            self.enemies.compact()
+        elif rammed:
+            for i in rammed:
+                self.enemy_pool.release(self.enemies[i])
+            rammed = set(rammed)
+            self.enemies = [enemy for i, enemy in enumerate(self.enemies) if i not in rammed]
+
+        collected = set()
+        for kind, i in touched:
+            if kind != 1 or not self.powerups[i].collides_with_player(player):
+                continue
+            powerup = self.powerups[i]
+            if powerup.type == "shield":
+                player.activate_shield(rules.shield_duration)
+                self.events.append("powerup")
+            elif powerup.type == "rapid_fire":
+                player.rapid_fire = True
+                player.rapid_timer = rules.rapid_duration
+            elif powerup.type == "health":
+                player.health = min(player.max_health, player.health + rules.health_bonus)
+            collected.add(i)
+        if collected:
+            for i in collected:
+                self.powerup_pool.release(self.powerups[i])
+            self.powerups = [powerup for i, powerup in enumerate(self.powerups) if i not in collected]
+
+        if prof: prof.stop("update.player_hits")
+
+        # Update explosions
+        if prof: prof.start("update.explosions")
+        for explosion in self.explosions:
+            explosion.update(self.step)
+        self.explosions = self._sweep(self.explosions, Explosion.is_done, self.explosion_pool)
+        if prof: prof.stop("update.explosions")
+
+        # Spawn enemies randomly
+        limits = self.limits
+        if (self.rng.random() < rules.enemy_spawn * self.step and
+                (limits.enemies is None or len(self.enemies) < limits.enemies)):
+            self.enemies.append(self.enemy_pool.acquire(self.scale, self.width, self.rng))
+
+        # Spawn power-ups randomly
+        if (self.rng.random() < rules.powerup_spawn * self.step and
+                (limits.powerups is None or len(self.powerups) < limits.powerups)):
+            self.powerups.append(self.powerup_pool.acquire(self.scale, self.width, self.rng))
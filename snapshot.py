@@ -0,0 +1,236 @@
+import struct
+import zlib
+from array import array
+from collections import deque
+from itertools import chain
+from operator import attrgetter
+
+from sim import EntityArray, Rules, Limits, DEFAULT_RULES, POWERUP_TYPES, REFERENCE_RATE, np
+
+# Game state snapshots.
+# snapshot(game) packs everything Game.update reads into one bytes buffer:
+# game counters, rules and limits, the player, the RNG state and every
+# entity. restore(game, data) puts it back, so the game continues exactly as
+# the original did from that tick. Each entity is one row of little-endian
+# doubles (BULLET, ENEMY, ...); list entities are packed and unpacked a row at
+# a time and the NumPy stores convert whole tables at once, so a snapshot
+# taken in one store mode restores into the other. Layout: HEADER, RULES,
+# LIMITS, PLAYER, RNG state (625 uint32 words, then the cached gauss value),
+# then the bullet, enemy, power-up (plus one type byte each) and explosion
+# rows.
+MAGIC = b"SSSN"
+VERSION = 2
+HEADER = struct.Struct("<4sBBHHHqQdIIII")   # magic, version, flags, width, height, tick rate, score, ticks, damage taken, entity counts
+RULES = struct.Struct("<6d")
+LIMITS = struct.Struct("<3i")               # -1 for no cap
+PLAYER = struct.Struct("<13dq")
+PLAYER_FIELDS = ("scale", "width", "height", "x", "y", "prev_x", "prev_y", "speed",
+                 "shoot_cooldown", "rapid_timer", "shield_timer", "health", "max_health", "lives")
+RNG_WORDS = 625
+GAUSS = struct.Struct("<?d")
+
+GAME_OVER, RAPID_FIRE, SHIELD_ACTIVE = 1, 2, 4
+
+BULLET_FIELDS = ("x", "y", "prev_x", "prev_y", "radius", "speed")
+ENEMY_FIELDS = ("x", "y", "prev_x", "prev_y", "width", "height", "speed", "direction", "oscillation_speed", "sway")
+POWERUP_FIELDS = ("x", "y", "prev_x", "prev_y", "width", "height", "speed")
+EXPLOSION_FIELDS = ("x", "y", "scale", "age")
+BULLET, ENEMY, POWERUP, EXPLOSION = (struct.Struct(f"<{len(fields)}d") for fields in
+                                     (BULLET_FIELDS, ENEMY_FIELDS, POWERUP_FIELDS, EXPLOSION_FIELDS))
+
+def rows(entities, fields):
+    n = len(entities)
+    if isinstance(entities, EntityArray):
+        return np.column_stack([getattr(entities, name)[:n] for name in fields]).tobytes()
+    return struct.pack(f"<{n * len(fields)}d", *chain.from_iterable(map(attrgetter(*fields), entities)))
+
+def snapshot(game):
+    player = game.player
+    flags = (game.game_over and GAME_OVER) | (player.rapid_fire and RAPID_FIRE) | (player.shield_active and SHIELD_ACTIVE)
+    _, state, gauss = game.rng.getstate()
+    parts = [
+        HEADER.pack(MAGIC, VERSION, flags, game.width, game.height, game.tick_rate, game.score, game.ticks,
+                    game.damage_taken, len(game.bullets), len(game.enemies), len(game.powerups), len(game.explosions)),
+        RULES.pack(*game.rules),
+        LIMITS.pack(*(-1 if cap is None else cap for cap in game.limits)),
+        PLAYER.pack(*(getattr(player, name) for name in PLAYER_FIELDS)),
+        array("I", state).tobytes(),
+        GAUSS.pack(gauss is not None, gauss or 0.0),
+    ]
+    parts.append(rows(game.bullets, BULLET_FIELDS))
+    parts.append(rows(game.enemies, ENEMY_FIELDS))
+    parts.append(rows(game.powerups, POWERUP_FIELDS))
+    parts.append(bytes(POWERUP_TYPES.index(powerup.type) for powerup in game.powerups))
+    parts.append(rows(game.explosions, EXPLOSION_FIELDS))
+    return b"".join(parts)
+
+def load_table(store, data, offset, n, fields):
+    while len(store.alive) < n:
+        store._grow()
+    table = np.frombuffer(data, dtype=np.float64, count=n * len(fields), offset=offset).reshape(n, len(fields))
+    for i, name in enumerate(fields):
+        getattr(store, name)[:n] = table[:, i]
+    store.alive[:n] = True
+    store.alive[n:] = False
+    store.count = n
+    return store
+
+# Row loaders for list entities: one unrolled assignment per field is several
+# times faster than any generic setattr loop
+def load_bullets(bullets, rows):
+    for bullet, (x, y, prev_x, prev_y, radius, speed) in zip(bullets, rows):
+        bullet.x, bullet.y, bullet.prev_x, bullet.prev_y = x, y, prev_x, prev_y
+        bullet.radius, bullet.speed = radius, speed
+
+def load_enemies(enemies, rows):
+    for enemy, (x, y, prev_x, prev_y, width, height, speed, direction, oscillation_speed, sway) in zip(enemies, rows):
+        enemy.x, enemy.y, enemy.prev_x, enemy.prev_y = x, y, prev_x, prev_y
+        enemy.width, enemy.height, enemy.speed = width, height, speed
+        enemy.direction, enemy.oscillation_speed, enemy.sway = direction, oscillation_speed, sway
+
+def load_powerups(powerups, rows):
+    for powerup, (x, y, prev_x, prev_y, width, height, speed) in zip(powerups, rows):
+        powerup.x, powerup.y, powerup.prev_x, powerup.prev_y = x, y, prev_x, prev_y
+        powerup.width, powerup.height, powerup.speed = width, height, speed
+
+def load_explosions(explosions, rows):
+    for explosion, (x, y, scale, age) in zip(explosions, rows):
+        explosion.x, explosion.y, explosion.scale, explosion.age = x, y, scale, age
+
+# Loads n rows at offset into a NumPy store, or into n instances taken from
+# pool; returns the entities and the offset past the rows
+def load_rows(data, offset, n, row, load, pool, fields, store=None):
+    end = offset + n * row.size
+    if store is not None:
+        return load_table(store, data, offset, n, fields), end
+    entities = pool.take(n)
+    load(entities, row.iter_unpack(data[offset:end]))
+    return entities, end
+
+def restore(game, data):
+    (magic, version, flags, width, height, tick_rate, score, ticks, damage_taken,
+     bullets, enemies, powerups, explosions) = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a version {VERSION} snapshot")
+    offset = HEADER.size
+
+    if (width, height) != (game.width, game.height):
+        game.resize(width, height)
+    game.tick_rate = tick_rate
+    game.step = REFERENCE_RATE / tick_rate
+    game.score, game.ticks = score, ticks
+    game.damage_taken = int(damage_taken) if damage_taken.is_integer() else damage_taken
+    game.game_over = bool(flags & GAME_OVER)
+    game.events.clear()
+
+    # Whole values come back as ints where the default is one, so restored
+    # rules (and health, below) look exactly like the originals
+    rules = RULES.unpack_from(data, offset)
+    game.rules = Rules(*(int(value) if isinstance(default, int) and value.is_integer() else value
+                         for default, value in zip(DEFAULT_RULES, rules)))
+    offset += RULES.size
+    game.limits = Limits(*(None if cap < 0 else cap for cap in LIMITS.unpack_from(data, offset)))
+    offset += LIMITS.size
+
+    player = game.player
+    values = PLAYER.unpack_from(data, offset)
+    for name, value in zip(PLAYER_FIELDS, values):
+        setattr(player, name, value)
+    player.health = int(player.health) if player.health.is_integer() else player.health
+    player.max_health = int(player.max_health) if player.max_health.is_integer() else player.max_health
+    player.bounds = (width, height)
+    player.rapid_fire = bool(flags & RAPID_FIRE)
+    player.shield_active = bool(flags & SHIELD_ACTIVE)
+    offset += PLAYER.size
+
+    state = array("I")
+    state.frombytes(data[offset:offset + 4 * RNG_WORDS])
+    offset += 4 * RNG_WORDS
+    has_gauss, gauss = GAUSS.unpack_from(data, offset)
+    offset += GAUSS.size
+    game.rng.setstate((3, tuple(state), gauss if has_gauss else None))
+
+    game.release_entities()
+    arrays = game.use_arrays
+    game.bullets, offset = load_rows(data, offset, bullets, BULLET, load_bullets, game.bullet_pool,
+                                     BULLET_FIELDS, game.bullets if arrays else None)
+    game.enemies, offset = load_rows(data, offset, enemies, ENEMY, load_enemies, game.enemy_pool,
+                                     ENEMY_FIELDS, game.enemies if arrays else None)
+    game.powerups, offset = load_rows(data, offset, powerups, POWERUP, load_powerups, game.powerup_pool,
+                                      POWERUP_FIELDS)
+    for powerup, kind in zip(game.powerups, data[offset:offset + powerups]):
+        powerup.type = POWERUP_TYPES[kind]
+    offset += powerups
+    game.explosions, offset = load_rows(data, offset, explosions, EXPLOSION, load_explosions,
+                                        game.explosion_pool, EXPLOSION_FIELDS)
+
+# Delta encoding: the XOR of two snapshots is mostly zero bytes (sizes,
+# speeds, the player and most of the RNG state rarely change between ticks),
+# so it compresses far below a full snapshot. A delta is the target's length
+# followed by the zlib-compressed XOR, zero-padded to the longer buffer.
+DELTA = struct.Struct("<I")
+
+def _xor(a, b, n):
+    a, b = a.ljust(n, b"\0"), b.ljust(n, b"\0")
+    if np is not None:
+        return np.bitwise_xor(np.frombuffer(a, dtype=np.uint8), np.frombuffer(b, dtype=np.uint8)).tobytes()
+    return (int.from_bytes(a, "little") ^ int.from_bytes(b, "little")).to_bytes(n, "little")
+
+def delta(base, data):
+    return DELTA.pack(len(data)) + zlib.compress(_xor(base, data, max(len(base), len(data))), 1)
+
+def apply_delta(base, encoded):
+    (length,) = DELTA.unpack_from(encoded)
+    diff = zlib.decompress(encoded[DELTA.size:])
+    return _xor(base, diff, len(diff))[:length]
+
+# Ring of the most recent snapshots, for rollback. Every keyframe_every-th
+# push stores a full snapshot; the others store a delta against that
+# keyframe, so getting any entry back costs at most one apply_delta.
+# Entries are numbered by the ring itself, counting pushes from 0, since
+# Game.ticks stands still at game over and restarts from 0; pushing once per
+# update makes the number the count of ticks fed.
+class SnapshotRing:
+    def __init__(self, capacity=120, keyframe_every=30):
+        self.entries = deque(maxlen=capacity)   # (number, keyframe, delta or None)
+        self.keyframe_every = keyframe_every
+        self.keyframe = None
+        self.since_keyframe = 0
+        self.pushes = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    # Returns the entry's number
+    def push(self, game):
+        data = snapshot(game)
+        number = self.pushes
+        if self.keyframe is None or self.since_keyframe >= self.keyframe_every:
+            self.keyframe = data
+            self.since_keyframe = 0
+            self.entries.append((number, data, None))
+        else:
+            self.entries.append((number, self.keyframe, delta(self.keyframe, data)))
+        self.since_keyframe += 1
+        self.pushes += 1
+        return number
+
+    def get(self, index):
+        _, keyframe, encoded = self.entries[index]
+        return keyframe if encoded is None else apply_delta(keyframe, encoded)
+
+    # Restores the newest entry numbered at or before number and forgets
+    # everything after it (the caller re-simulates from there; the next push
+    # is numbered straight after it). Returns the restored entry's number, or
+    # None when the ring holds nothing that old.
+    def rollback(self, game, number):
+        for index in range(len(self.entries) - 1, -1, -1):
+            restored = self.entries[index][0]
+            if restored <= number:
+                restore(game, self.get(index))
+                while len(self.entries) > index + 1:
+                    self.entries.pop()
+                self.keyframe, self.since_keyframe = None, 0
+                self.pushes = restored + 1
+                return restored
+        return None
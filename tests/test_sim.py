@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sim import Game, IDLE
+
+pytest.importorskip("numpy")
+
+# Enemies spawned at 800x600 (40px) are wider than the 32px grid cells after
+# shrinking to 400x300, so each one here overlaps three cell columns; the only
+# bullet inside it is in the third
+def crowd(use_arrays):
+    game = Game(800, 600, use_arrays=use_arrays, seed=5)
+    game.rules = game.rules._replace(enemy_spawn=0.0, powerup_spawn=0.0)
+    game.resize(400, 300)
+    for i in range(5):
+        enemy = game.enemy_pool.acquire(1.0, 800, game.rng)
+        enemy.x = enemy.prev_x = 64 * i + 28
+        enemy.y = enemy.prev_y = 40
+        enemy.sway = 0.0
+        game.enemies.append(enemy)
+        game.bullets.append(game.bullet_pool.acquire(64 * i + 66, 70, 0.5))
+    game.update(IDLE)
+    return game
+
+def test_arrays_match_lists_after_shrink():
+    lists, arrays = crowd(False), crowd(True)
+    assert arrays.score == lists.score > 0
+    assert len(arrays.enemies) == len(lists.enemies)
+    assert len(arrays.bullets) == len(lists.bullets)
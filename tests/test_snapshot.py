@@ -0,0 +1,42 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sim import Game, Controls, IDLE, Rules
+from snapshot import snapshot, restore, SnapshotRing
+
+def test_fractional_rules_restore_exactly():
+    rules = Rules(enemy_spawn=0.08, ram_damage=12.5, health_bonus=7.5, shield_duration=250.5)
+    game = Game(seed=11, rules=rules)
+    while game.damage_taken == 0:
+        game.update(IDLE)
+    assert isinstance(game.player.health, float)
+
+    copy = Game(seed=0)
+    restore(copy, snapshot(game))
+    assert copy.rules == rules
+    assert copy.player.health == game.player.health
+    for tick in range(600):
+        controls = Controls(dx=(tick // 30) % 3 - 1, shoot=True, restart=True)
+        game.update(controls)
+        copy.update(controls)
+    assert snapshot(copy) == snapshot(game)
+
+def test_ring_rolls_back_across_game_over_and_restart():
+    game = Game(seed=3)
+    ring = SnapshotRing(capacity=20000, keyframe_every=30)
+    saved = {}
+    fed = 0
+    while not game.game_over:
+        saved[ring.push(game)] = snapshot(game)
+        game.update(IDLE)
+        fed += 1
+    before_restart = fed - 1
+    for controls in [IDLE] * 20 + [Controls(restart=True)] + [IDLE] * 50:
+        saved[ring.push(game)] = snapshot(game)
+        game.update(controls)
+
+    assert ring.rollback(game, before_restart) == before_restart
+    assert snapshot(game) == saved[before_restart]
+    assert ring.push(game) == before_restart + 1
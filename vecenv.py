@@ -0,0 +1,144 @@
+import itertools
+
+import numpy as np
+
+from sim import Game, Controls, DEFAULT_RULES, POWERUP_TYPES
+
+# Vectorized environments for training agents.
+# VecEnv holds N Games and steps them all from one batch of actions, returning
+# NumPy observations, rewards (score gained) and done flags (game over). A
+# finished game is reset in place and its observation is the new game's, so
+# callers never reset by hand; the final score is kept in final_scores.
+#
+# Observations are either "features", a fixed-length float32 vector per game
+# (see FEATURES), or "pixels", the RGB frame drawn by a Renderer per game, as
+# an (N, height, width, 3) uint8 view. Each Renderer draws onto a surface
+# built over its game's slice of one (N, height, width, 4) RGBX batch buffer,
+# so frames are never copied; the view skips the padding byte (copy it with
+# np.ascontiguousarray if a consumer needs packed RGB). Renderers are built
+# once, so resets reuse their fonts, sprites and starfield.
+#
+#   env = VecEnv(64)
+#   obs = env.reset()
+#   obs, rewards, dones = env.step(policy(obs))
+
+# Discrete actions: every (dx, dy, shoot, burst) combination
+ACTIONS = [Controls(dx, dy, bool(shoot), bool(burst))
+           for dx, dy, shoot, burst in itertools.product((-1, 0, 1), (-1, 0, 1), (0, 1), (0, 1))]
+
+# Feature vector layout. Positions are relative to the player's centre and
+# divided by the window size; empty slots are all zero.
+PLAYER_FEATURES = 8   # x, y, health, lives, shield, shield time, rapid fire, shot ready
+ENEMY_FEATURES = 3    # present, dx, dy
+POWERUP_FEATURES = 3 + len(POWERUP_TYPES)   # present, dx, dy, one-hot type
+
+def feature_size(max_enemies, max_powerups):
+    return PLAYER_FEATURES + ENEMY_FEATURES * max_enemies + POWERUP_FEATURES * max_powerups
+
+# Centres of the live enemies, from either entity store
+def enemy_centres(enemies):
+    if hasattr(enemies, "alive"):
+        n = enemies.count
+        live = enemies.alive[:n]
+        return np.stack([(enemies.x[:n] + enemies.width[:n] / 2)[live],
+                         (enemies.y[:n] + enemies.height[:n] / 2)[live]], axis=1)
+    return np.array([(e.x + e.width / 2, e.y + e.height / 2) for e in enemies], dtype=np.float64).reshape(-1, 2)
+
+class VecEnv:
+    def __init__(self, num_envs, width=800, height=600, observation="features", max_enemies=16,
+                 max_powerups=4, repeat=1, seed=0, use_arrays=False, rules=DEFAULT_RULES):
+        if observation not in ("features", "pixels"):
+            raise ValueError(f"observation must be 'features' or 'pixels', not {observation!r}")
+        self.num_envs = num_envs
+        self.observation = observation
+        self.max_enemies = max_enemies
+        self.max_powerups = max_powerups
+        self.repeat = repeat
+        self.games = [Game(width, height, use_arrays=use_arrays, seed=seed + i, rules=rules)
+                      for i in range(num_envs)]
+        self.rewards = np.zeros(num_envs, dtype=np.float32)
+        self.dones = np.zeros(num_envs, dtype=bool)
+        self.final_scores = np.zeros(num_envs, dtype=np.int64)
+
+        if observation == "pixels":
+            # Only pixel observations need pygame
+            import pygame
+            from render import Renderer
+            pygame.font.init()
+            self.frames = np.zeros((num_envs, height, width, 4), dtype=np.uint8)
+            self.renderers = []
+            for i in range(num_envs):
+                renderer = Renderer(pygame.image.frombuffer(self.frames[i], (width, height), "RGBX"))
+                renderer.rng.seed(seed + i)
+                renderer.build_stars()   # from the seeded RNG, so frames are reproducible
+                self.renderers.append(renderer)
+            self.obs = self.frames[..., :3]
+        else:
+            self.obs = np.zeros((num_envs, feature_size(max_enemies, max_powerups)), dtype=np.float32)
+
+    def reset(self):
+        for game in self.games:
+            game.reset()
+        self.observe()
+        return self.obs
+
+    # actions: N indices into ACTIONS, or an (N, 4) array of dx, dy, shoot, burst
+    def step(self, actions):
+        actions = np.asarray(actions)
+        rewards, dones = self.rewards, self.dones
+        for i, game in enumerate(self.games):
+            if actions.ndim == 1:
+                controls = ACTIONS[actions[i]]
+            else:
+                dx, dy, shoot, burst = actions[i].tolist()
+                controls = Controls(int(dx), int(dy), bool(shoot), bool(burst))
+            score = game.score
+            for _ in range(self.repeat):
+                game.update(controls)
+                if game.game_over:
+                    break
+            rewards[i] = game.score - score
+            dones[i] = game.game_over
+            if game.game_over:
+                self.final_scores[i] = game.score
+                game.reset()
+        self.observe()
+        return self.obs, rewards, dones
+
+    def observe(self):
+        if self.observation == "pixels":
+            self.observe_pixels()
+        else:
+            for i, game in enumerate(self.games):
+                self.observe_features(game, self.obs[i])
+
+    # Renderers draw straight into self.frames
+    def observe_pixels(self):
+        for game, renderer in zip(self.games, self.renderers):
+            renderer.draw(game)
+
+    def observe_features(self, game, out):
+        out[:] = 0.0
+        player = game.player
+        width, height = game.width, game.height
+        px, py = player.x + player.width / 2, player.y + player.height / 2
+        out[:PLAYER_FEATURES] = (px / width, py / height, player.health / player.max_health, player.lives,
+                                 player.shield_active, player.shield_timer / game.rules.shield_duration,
+                                 player.rapid_fire, player.shoot_cooldown <= 0)
+
+        # Nearest enemies first
+        base = PLAYER_FEATURES
+        centres = enemy_centres(game.enemies)
+        if len(centres):
+            offsets = (centres - (px, py)) / (width, height)
+            nearest = np.argsort((offsets ** 2).sum(axis=1))[:self.max_enemies]
+            slots = out[base:base + ENEMY_FEATURES * len(nearest)].reshape(-1, ENEMY_FEATURES)
+            slots[:, 0] = 1.0
+            slots[:, 1:] = offsets[nearest]
+        base += ENEMY_FEATURES * self.max_enemies
+
+        for powerup in game.powerups[:self.max_powerups]:
+            out[base:base + 3] = (1.0, (powerup.x + powerup.width / 2 - px) / width,
+                                  (powerup.y + powerup.height / 2 - py) / height)
+            out[base + 3 + POWERUP_TYPES.index(powerup.type)] = 1.0
+            base += POWERUP_FEATURES